@@ -6,7 +6,7 @@ from PyQt5 import uic, QtWidgets
 from ..utils import ui
 from ..utils.logging import error
 
-from ..threads.load_api_data_thread import LoadAPIDataThread
+from ..threads.load_api_data_task import LoadAPIDataTask
 from ..models.api import API
 
 FORM_CLASS, _ = uic.loadUiType(ui.path('add_edit_api_dialog.ui'))
@@ -52,11 +52,11 @@ class AddEditAPIDialog(QtWidgets.QDialog, FORM_CLASS):
             api_id = self.api.id
 
         api = API({'id': api_id, 'href': self.urlEditBox.text()})
-        self.loading_thread = LoadAPIDataThread(
+        self.loading_task = LoadAPIDataTask(
             api,
             on_error=self.on_api_error,
             on_finished=self.on_api_success)
-        self.loading_thread.start()
+        self.loading_task.start()
 
     def on_api_error(self, e):
         self.set_all_enabled(True)
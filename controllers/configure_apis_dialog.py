@@ -1,7 +1,7 @@
 from PyQt5 import uic, QtWidgets
 
 from ..utils import ui
-from ..utils.config import Config
+from ..utils.config import shared_config
 
 from ..controllers.add_edit_api_dialog import AddEditAPIDialog
 
@@ -58,7 +58,7 @@ class ConfigureAPIDialog(QtWidgets.QDialog, FORM_CLASS):
         dialog.exec_()
 
     def edit_api(self, api):
-        config = Config()
+        config = shared_config()
         new_apis = []
 
         for a in config.apis:
@@ -67,25 +67,23 @@ class ConfigureAPIDialog(QtWidgets.QDialog, FORM_CLASS):
             new_apis.append(a)
         new_apis.append(api)
         config.apis = new_apis
-        config.save()
 
         self.data['apis'] = config.apis
         self.populate_api_list()
         self.populate_api_details()
 
     def add_api(self, api):
-        config = Config()
+        config = shared_config()
         apis = config.apis
         apis.append(api)
         config.apis = apis
-        config.save()
 
         self.data['apis'] = config.apis
         self.populate_api_list()
         self.populate_api_details()
 
     def remove_api(self, api):
-        config = Config()
+        config = shared_config()
         new_apis = []
 
         for a in config.apis:
@@ -94,7 +92,6 @@ class ConfigureAPIDialog(QtWidgets.QDialog, FORM_CLASS):
             new_apis.append(a)
 
         config.apis = new_apis
-        config.save()
 
         self.data['apis'] = config.apis
         self.populate_api_list()
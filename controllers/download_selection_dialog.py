@@ -3,6 +3,8 @@ from PyQt5 import QtWidgets
 from PyQt5 import QtCore
 
 from ..utils import ui
+from ..utils.config import shared_config
+from ..models.item_store import ItemStore
 
 
 FORM_CLASS, _ = uic.loadUiType(ui.path('download_selection_dialog.ui'))
@@ -18,10 +20,14 @@ class DownloadSelectionDialog(QtWidgets.QDialog, FORM_CLASS):
 
         self.setupUi(self)
 
+        self._config = shared_config()
         self._current_item_index = 0
         self._downloads = []
+        self._store = ItemStore(self.data.get('items', []))
+        self._items = self._store.sorted_items()
 
         self.populate_current_item()
+        self.populate_segment_options()
 
         self.nextButton.clicked.connect(self.on_next_clicked)
         self.cancelButton.clicked.connect(self.on_cancel_clicked)
@@ -47,6 +53,23 @@ class DownloadSelectionDialog(QtWidgets.QDialog, FORM_CLASS):
             )
             asset_node.setCheckState(QtCore.Qt.Unchecked)
 
+    def populate_segment_options(self):
+        self.segmentsSpinBox.setValue(self._config.download_segments)
+        self.segmentThresholdSpinBox.setValue(
+            self._config.download_segment_threshold
+        )
+
+    def save_segment_options(self):
+        segments = self.segmentsSpinBox.value()
+        threshold = self.segmentThresholdSpinBox.value()
+        if segments == self._config.download_segments \
+                and threshold == self._config.download_segment_threshold:
+            return
+
+        self._config.download_segments = segments
+        self._config.download_segment_threshold = threshold
+        self._config.save()
+
     def add_current_item_to_downloads(self):
         apply_to_all = (
             self.applyAllCheckbox.checkState() == QtCore.Qt.Checked
@@ -55,12 +78,16 @@ class DownloadSelectionDialog(QtWidgets.QDialog, FORM_CLASS):
             self.addLayersCheckbox.checkState() == QtCore.Qt.Checked
         )
         stream_cogs = (self.streamCheckbox.checkState() == QtCore.Qt.Checked)
+        segments = self.segmentsSpinBox.value()
+        segment_threshold = self.segmentThresholdSpinBox.value() * 1024 * 1024
 
         download_data = {
             'item': self.current_item,
             'options': {
                 'add_to_layers': add_to_layers,
                 'stream_cogs': stream_cogs,
+                'segments': segments,
+                'segment_threshold': segment_threshold,
                 'assets': [a.key for a in self.selected_assets],
             },
         }
@@ -83,6 +110,8 @@ class DownloadSelectionDialog(QtWidgets.QDialog, FORM_CLASS):
                     'options': {
                         'add_to_layers': add_to_layers,
                         'stream_cogs': stream_cogs,
+                        'segments': segments,
+                        'segment_threshold': segment_threshold,
                         'assets': [a.key for a in self.selected_assets],
                     },
                 }
@@ -120,7 +149,7 @@ class DownloadSelectionDialog(QtWidgets.QDialog, FORM_CLASS):
 
     @property
     def items(self):
-        return sorted(self.data.get('items', []))
+        return self._items
 
     @property
     def stream(self):
@@ -175,6 +204,7 @@ class DownloadSelectionDialog(QtWidgets.QDialog, FORM_CLASS):
             self._current_item_index += 1
 
         if self.current_item is None:
+            self.save_segment_options()
             self.accept()
             return
 
@@ -6,8 +6,9 @@ from PyQt5 import QtCore
 
 from qgis.PyQt.QtWidgets import QProgressBar
 
-from ..utils.logging import error
-from ..threads.download_items_thread import DownloadItemsThread
+from ..utils.config import shared_config
+from ..utils.logging import error, info
+from ..threads.download_items_task import DownloadItemsTask
 
 
 class DownloadController:
@@ -19,17 +20,23 @@ class DownloadController:
         self._progress_message_bar = None
         self._loading_closed = False
 
-        self.loading_thread = DownloadItemsThread(
+        config = shared_config()
+        self.loading_task = DownloadItemsTask(
             self.downloads,
             self.download_directory,
             on_progress=self.on_progress_update,
             on_gdal_error=self.on_gdal_error,
             on_error=self.on_error,
             on_add_layer=self.on_add_layer,
-            on_finished=self.on_downloading_finished
+            on_finished=self.on_downloading_finished,
+            on_cancelled=self.on_downloading_cancelled,
+            max_workers=config.download_workers,
+            max_connections_per_host=config.download_connections_per_host,
+            use_asset_store=config.use_asset_store,
+            asset_store_size=config.asset_store_size * 1024 * 1024
         )
 
-        self.loading_thread.start()
+        self.loading_task.start()
 
     @property
     def downloads(self):
@@ -62,8 +69,8 @@ class DownloadController:
 
     def on_destroyed(self, event):
         self._loading_closed = True
-        if not self.loading_thread.isFinished:
-            self.loading_thread.terminate()
+        if not self.loading_task.is_finished():
+            self.loading_task.cancel()
 
     def on_progress_update(self, current_step, total_steps, status):
         if self._loading_closed:
@@ -74,7 +81,6 @@ class DownloadController:
             )
             self._progress_message_bar.destroyed.connect(self.on_destroyed)
             self._progress = QProgressBar()
-            self._progress.setMaximum(total_steps)
             self._progress.setAlignment(
                 QtCore.Qt.AlignRight | QtCore.Qt.AlignVCenter
             )
@@ -86,7 +92,11 @@ class DownloadController:
         else:
             self._progress_message_bar.setText(status)
 
-        self._progress.setValue(current_step - 1)
+        self._progress.setMaximum(max(total_steps, 1))
+        self._progress.setValue(current_step)
 
     def on_downloading_finished(self):
         self.iface.messageBar().clearWidgets()
+
+    def on_downloading_cancelled(self):
+        info(self.iface, 'Download cancelled')
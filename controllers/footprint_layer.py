@@ -0,0 +1,170 @@
+from PyQt5.QtCore import QVariant
+
+from qgis.core import (QgsVectorLayer, QgsFeature, QgsField, QgsGeometry,
+                       QgsPointXY, QgsRectangle, QgsProject, QgsFillSymbol)
+
+
+LAYER_NAME = 'STAC Footprints'
+
+
+def footprint_geometry(item):
+    geometry = item.geometry or {}
+    coordinates = geometry.get('coordinates', [])
+
+    def ring(points):
+        return [QgsPointXY(p[0], p[1]) for p in points]
+
+    if geometry.get('type', None) == 'Polygon':
+        return QgsGeometry.fromMultiPolygonXY([
+            [ring(r) for r in coordinates]
+        ])
+
+    if geometry.get('type', None) == 'MultiPolygon':
+        return QgsGeometry.fromMultiPolygonXY([
+            [ring(r) for r in polygon] for polygon in coordinates
+        ])
+
+    bbox = item.bbox
+    if bbox is not None and len(bbox) in [4, 6]:
+        if len(bbox) == 6:
+            bbox = [bbox[0], bbox[1], bbox[3], bbox[4]]
+        return QgsGeometry.fromRect(QgsRectangle(*bbox))
+
+    return None
+
+
+class FootprintLayer:
+    def __init__(self):
+        self._layer = None
+        self._layer_id = None
+        self._items = {}
+        self._feature_ids = {}
+
+        self.on_selection_changed = None
+
+    @property
+    def layer(self):
+        if self._layer is None:
+            return None
+
+        if QgsProject.instance().mapLayer(self._layer_id) is None:
+            self._layer = None
+            self._items = {}
+            self._feature_ids = {}
+            return None
+
+        return self._layer
+
+    def create_layer(self):
+        layer = QgsVectorLayer(
+            'MultiPolygon?crs=EPSG:4326&index=yes',
+            LAYER_NAME,
+            'memory'
+        )
+        layer.dataProvider().addAttributes([
+            QgsField('id', QVariant.String),
+            QgsField('collection', QVariant.String),
+            QgsField('datetime', QVariant.String),
+            QgsField('cloud_cover', QVariant.Double),
+            QgsField('api', QVariant.String),
+        ])
+        layer.updateFields()
+        layer.renderer().setSymbol(QgsFillSymbol.createSimple({
+            'color': '0,0,0,0',
+            'outline_color': '255,127,0,255',
+            'outline_width': '0.4',
+        }))
+        layer.selectionChanged.connect(self._on_layer_selection_changed)
+
+        QgsProject.instance().addMapLayer(layer)
+
+        self._layer = layer
+        self._layer_id = layer.id()
+        self._items = {}
+        self._feature_ids = {}
+
+    def clear(self):
+        layer = self.layer
+        if layer is None:
+            return
+
+        layer.removeSelection()
+        layer.dataProvider().truncate()
+        layer.updateExtents()
+        layer.triggerRepaint()
+        self._items = {}
+        self._feature_ids = {}
+
+    def add_items(self, items):
+        if self.layer is None:
+            self.create_layer()
+
+        layer = self._layer
+        features = []
+        added_items = []
+        for item in items:
+            geometry = footprint_geometry(item)
+            if geometry is None:
+                continue
+
+            feature = QgsFeature(layer.fields())
+            feature.setGeometry(geometry)
+            feature.setAttributes([
+                item.id,
+                item.collection_id,
+                item.properties.get('datetime', None),
+                item.properties.get('eo:cloud_cover', None),
+                item.api.href if item.api is not None else None,
+            ])
+            features.append(feature)
+            added_items.append(item)
+
+        if not features:
+            return
+
+        ok, features = layer.dataProvider().addFeatures(features)
+        if not ok:
+            return
+
+        for item, feature in zip(added_items, features):
+            self._items[feature.id()] = item
+            self._feature_ids[id(item)] = feature.id()
+
+        layer.updateExtents()
+        layer.triggerRepaint()
+
+    def feature_id(self, item):
+        return self._feature_ids.get(id(item), None)
+
+    def item(self, feature_id):
+        return self._items.get(feature_id, None)
+
+    def selected_items(self):
+        layer = self.layer
+        if layer is None:
+            return []
+
+        return [
+            self._items[fid] for fid in layer.selectedFeatureIds()
+            if fid in self._items
+        ]
+
+    def select_items(self, items):
+        layer = self.layer
+        if layer is None:
+            return
+
+        feature_ids = [self.feature_id(item) for item in items]
+        layer.selectByIds([fid for fid in feature_ids if fid is not None])
+
+    def flash_item(self, canvas, item):
+        layer = self.layer
+        feature_id = self.feature_id(item)
+        if layer is None or feature_id is None:
+            return
+
+        canvas.flashFeatureIds(layer, [feature_id])
+
+    def _on_layer_selection_changed(self, selected, deselected, clear):
+        if self.on_selection_changed is not None:
+            self.on_selection_changed()
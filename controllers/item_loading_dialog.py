@@ -2,8 +2,9 @@ from PyQt5 import uic, QtWidgets
 import urllib
 
 from ..utils import ui
+from ..utils.config import shared_config
 from ..utils.logging import error
-from ..threads.load_items_thread import LoadItemsThread
+from ..threads.load_items_task import LoadItemsTask
 
 
 FORM_CLASS, _ = uic.loadUiType(ui.path('item_loading_dialog.ui'))
@@ -20,26 +21,58 @@ class ItemLoadingDialog(QtWidgets.QDialog, FORM_CLASS):
         self.setupUi(self)
         self.setFixedSize(self.size())
 
-        self.loading_thread = LoadItemsThread(self.data['api_collections'],
-                                              self.data['extent'],
-                                              self.data['start_time'],
-                                              self.data['end_time'],
-                                              on_progress=self.on_progress,
-                                              on_error=self.on_error,
-                                              on_finished=self.on_finished)
+        self._item_count = 0
+        self._api_status = {}
 
-        self.loading_thread.start()
+        config = shared_config()
+        self.loading_task = LoadItemsTask(
+            self.data['api_collections'],
+            self.data['extent'],
+            self.data['start_time'],
+            self.data['end_time'],
+            page_limit=config.search_page_limit,
+            item_limit=config.search_item_limit,
+            prefetch_depth=config.search_prefetch_depth,
+            cache_ttl=config.search_cache_ttl,
+            drop_keys=('links',) if config.drop_item_links else (),
+            on_progress=self.on_progress,
+            on_page=self.on_page,
+            on_api_error=self.on_api_error,
+            on_error=self.on_error,
+            on_finished=self.on_finished)
+
+        self.loading_task.start()
 
     def on_progress(self, api, collections, current_page):
         collection_label = ', '.join([c.title for c in collections])
-        self.loadingLabel.setText('\n'.join((
-            f'Searching {api.title}',
-            f'Collections: [{collection_label}]',
-            f'Page {current_page}...'
-        )))
+        self._api_status[api.id] = \
+            f'{api.title} [{collection_label}]: Page {current_page}...'
+        self.update_label()
+
+    def on_page(self, api, items):
+        self._item_count += len(items)
+        self.update_label()
+
+        if self.hooks.get('on_page', None) is not None:
+            self.hooks['on_page'](api, items)
+
+    def update_label(self):
+        lines = list(self._api_status.values())
+        lines.append(f'{self._item_count} items found')
+        self.loadingLabel.setText('\n'.join(lines))
+        self.setFixedHeight(self.sizeHint().height())
+
+    def on_api_error(self, api, e):
+        if isinstance(e, urllib.error.URLError):
+            error(self.iface, f'Search failed for {api.title}; {e.reason}')
+        else:
+            error(self.iface,
+                  f'Search failed for {api.title}; {type(e).__name__}')
+        self._api_status[api.id] = f'{api.title}: Failed'
+        self.update_label()
 
     def on_error(self, e):
-        if type(e) == urllib.error.URLError:
+        if isinstance(e, urllib.error.URLError):
             error(self.iface, f'Network Error: {e.reason}')
         else:
             error(self.iface, f'Network Error: {type(e).__name__}')
@@ -50,5 +83,5 @@ class ItemLoadingDialog(QtWidgets.QDialog, FORM_CLASS):
 
     def closeEvent(self, event):
         if event.spontaneous():
-            self.loading_thread.terminate()
+            self.loading_task.cancel()
             self.hooks['on_close']()
@@ -1,11 +1,10 @@
 from datetime import datetime
 
 from PyQt5 import uic, QtWidgets, QtCore
-from PyQt5.QtGui import QStandardItemModel
-from PyQt5.QtWidgets import QTreeWidgetItem
 
 from qgis.core import QgsProject, QgsMapLayer
 
+from ..models.collection_tree_model import CollectionTreeModel
 from ..utils import ui
 from ..utils.logging import error
 
@@ -24,7 +23,7 @@ class QueryDialog(QtWidgets.QDialog, FORM_CLASS):
         self.setupUi(self)
 
         self._extent_layers = None
-        self._api_tree_model = None
+        self._collection_tree_model = None
 
         self.populate_time_periods()
         self.populate_extent_layers()
@@ -32,6 +31,7 @@ class QueryDialog(QtWidgets.QDialog, FORM_CLASS):
 
         self.searchButton.clicked.connect(self.on_search_clicked)
         self.cancelButton.clicked.connect(self.on_cancel_clicked)
+        self.filterEdit.textChanged.connect(self.on_filter_changed)
 
     def populate_time_periods(self):
         now = QtCore.QDateTime.currentDateTimeUtc()
@@ -49,24 +49,26 @@ class QueryDialog(QtWidgets.QDialog, FORM_CLASS):
             self.extentLayer.addItem(layer.name())
 
     def populate_collection_list(self):
-        self._api_tree_model = QStandardItemModel(self.treeView)
-        for api in self.apis:
-            api_node = QTreeWidgetItem(self.treeView)
-            api_node.setText(0, f'{api.title}')
-            api_node.setFlags(
-                api_node.flags()
-                | QtCore.Qt.ItemIsTristate
-                | QtCore.Qt.ItemIsUserCheckable
-            )
-            api_node.setCheckState(0, QtCore.Qt.Unchecked)
-            for collection in sorted(api.collections):
-                title = collection.title.replace("\n", " ")
-                collection_node = QTreeWidgetItem(api_node)
-                collection_node.setText(0, title)
-                collection_node.setFlags(
-                    collection_node.flags() | QtCore.Qt.ItemIsUserCheckable
-                )
-                collection_node.setCheckState(0, QtCore.Qt.Unchecked)
+        # Collections are read from the catalog store on first expand
+        self._collection_tree_model = CollectionTreeModel(
+            self.data.get('apis', []),
+            parent=self
+        )
+        self.treeView.setModel(self._collection_tree_model)
+
+    def on_filter_changed(self, text):
+        model = self._collection_tree_model
+        model.set_filter(text)
+        if not text.strip():
+            return
+
+        for row in range(model.rowCount()):
+            index = model.index(row, 0)
+            if model.hasChildren(index):
+                self.treeView.expand(index)
+
+    def update_api(self, api):
+        self._collection_tree_model.update_api(api)
 
     def validate(self):
         valid = True
@@ -81,29 +83,7 @@ class QueryDialog(QtWidgets.QDialog, FORM_CLASS):
 
     @property
     def api_selections(self):
-        api_collections = []
-        root = self.treeView.invisibleRootItem()
-        for i in range(root.childCount()):
-            api_node = root.child(i)
-            api = self.apis[i]
-            selected_collections = []
-            for j in range(api_node.childCount()):
-                collection_node = api_node.child(j)
-                collection = api.collections[j]
-                if collection_node.checkState(0) == QtCore.Qt.Checked:
-                    selected_collections.append(collection)
-
-            if api_node.checkState(0) == QtCore.Qt.Checked \
-                    or api_node.checkState(0) == QtCore.Qt.PartiallyChecked:
-                api_collections.append({
-                    'api': api,
-                    'collections': selected_collections
-                })
-        return api_collections
-
-    @property
-    def apis(self):
-        return sorted(self.data.get('apis', []))
+        return self._collection_tree_model.selections()
 
     @property
     def extent_layer(self):
@@ -1,15 +1,28 @@
-import os
-
 from PyQt5 import uic, QtWidgets, QtCore, QtGui
 from PyQt5.QtWidgets import QFileDialog
 
-from ..utils import ui
-from ..utils.config import Config
-from ..threads.load_preview_thread import LoadPreviewThread
+from qgis.core import (QgsCoordinateReferenceSystem, QgsCoordinateTransform,
+                       QgsProject)
+from qgis.gui import QgsMapToolEmitPoint
+
+from ..utils import ui, thumbnail_cache
+from ..utils.config import shared_config
+from ..utils.lru_cache import LRUCache
+from ..models.item_store import ItemStore
+from ..models.item_list_model import ItemListModel
+from ..models.spatial_index import SpatialIndex
+from ..threads.load_preview_task import LoadPreviewTask
+from ..threads.decode_thumbnail_task import DecodeThumbnailTask
+from ..threads.thumbnail_prefetcher import ThumbnailPrefetcher
 
 
 FORM_CLASS, _ = uic.loadUiType(ui.path('results_dialog.ui'))
 
+PREFETCH_MARGIN = 10
+PREFETCH_DELAY = 100
+RESIZE_DELAY = 150
+PREVIEW_CACHE_SIZE = 64 * 1024 * 1024
+
 
 class ResultsDialog(QtWidgets.QDialog, FORM_CLASS):
     def __init__(self, data={}, hooks={}, parent=None, iface=None):
@@ -23,27 +36,114 @@ class ResultsDialog(QtWidgets.QDialog, FORM_CLASS):
 
         self._item_list_model = None
         self._selected_item = None
-        self._config = Config()
+        self._preview_task = None
+        self._decode_task = None
+        self._preview_key = None
+        self._previews = LRUCache(PREVIEW_CACHE_SIZE)
+        self._config = shared_config()
+        self._store = ItemStore(self.data.get('items', []))
+        self._order = self._store.argsort()
+        self._items = self._store.take(self._order)
+        self._spatial_index = None
+        self._point_tool = None
+        self._previous_map_tool = None
+        self._footprints = self.data.get('footprints', None)
+        self._rows_by_item = {
+            id(item): row for row, item in enumerate(self._items)
+        }
+        self._syncing_selection = False
+
+        thumbnail_cache.shared().max_size = \
+            self._config.thumbnail_cache_size * 1024 * 1024
+        self._prefetcher = ThumbnailPrefetcher(
+            on_image_loaded=self.on_image_loaded
+        )
+        self._prefetch_timer = QtCore.QTimer(self)
+        self._prefetch_timer.setSingleShot(True)
+        self._prefetch_timer.setInterval(PREFETCH_DELAY)
+        self._prefetch_timer.timeout.connect(self.prefetch_thumbnails)
+        self._resize_timer = QtCore.QTimer(self)
+        self._resize_timer.setSingleShot(True)
+        self._resize_timer.setInterval(RESIZE_DELAY)
+        self._resize_timer.timeout.connect(self.on_resize_settled)
 
         self.populate_item_list()
         self.populate_download_directory()
+        self.connect_footprints()
 
         self.list.activated.connect(self.on_list_clicked)
+        self.list.selectionModel().currentChanged.connect(
+            self.on_current_changed
+        )
+        self.list.verticalScrollBar().valueChanged.connect(
+            self.schedule_prefetch
+        )
+        self._item_list_model.rowsInserted.connect(self.schedule_prefetch)
         self.selectButton.clicked.connect(self.on_select_all_clicked)
         self.deselectButton.clicked.connect(self.on_deselect_all_clicked)
+        self.mapSelectButton.clicked.connect(self.on_map_select_clicked)
+        self.pointSelectButton.clicked.connect(self.on_point_select_clicked)
+        self.coverageSelectButton.clicked.connect(
+            self.on_coverage_select_clicked
+        )
+        self.coverageSelectButton.setEnabled(
+            self.data.get('extent', None) is not None
+        )
         self.downloadButton.clicked.connect(self.on_download_clicked)
         self.downloadPathButton.clicked.connect(self.on_download_path_clicked)
         self.backButton.clicked.connect(self.on_back_clicked)
 
     def populate_item_list(self):
-        self._item_list_model = QtGui.QStandardItemModel(self.list)
+        self._item_list_model = ItemListModel(self.items, self.list)
+        self.list.setUniformItemSizes(True)
+        self.list.setModel(self._item_list_model)
 
-        for item in self.items:
-            i = QtGui.QStandardItem(item.id)
-            i.setCheckable(True)
-            self._item_list_model.appendRow(i)
+    def connect_footprints(self):
+        if self._footprints is None:
+            return
 
-        self.list.setModel(self._item_list_model)
+        self._footprints.on_selection_changed = \
+            self.on_footprint_selection_changed
+        self._item_list_model.checked_changed.connect(
+            self.on_item_checks_changed
+        )
+        self.on_footprint_selection_changed()
+
+    def disconnect_footprints(self):
+        if self._footprints is None:
+            return
+
+        if self._footprints.on_selection_changed == \
+                self.on_footprint_selection_changed:
+            self._footprints.on_selection_changed = None
+
+    def on_footprint_selection_changed(self):
+        if self._syncing_selection:
+            return
+
+        rows = [
+            self._rows_by_item[id(item)]
+            for item in self._footprints.selected_items()
+            if id(item) in self._rows_by_item
+        ]
+        # Items without a footprint can't be selected on the map, so the
+        # map selection says nothing about them
+        rows.extend(
+            row for row in self._item_list_model.checked_rows()
+            if self._footprints.feature_id(
+                self._item_list_model.item(row)) is None
+        )
+        self._syncing_selection = True
+        self._item_list_model.set_checked_rows(rows)
+        self._syncing_selection = False
+
+    def on_item_checks_changed(self):
+        if self._syncing_selection:
+            return
+
+        self._syncing_selection = True
+        self._footprints.select_items(self.selected_items)
+        self._syncing_selection = False
 
     def populate_download_directory(self):
         self.downloadDirectory.setText(self._config.download_directory)
@@ -63,18 +163,27 @@ class ResultsDialog(QtWidgets.QDialog, FORM_CLASS):
             )
         self.propertiesTable.resizeColumnsToContents()
 
+    @property
+    def store(self):
+        return self._store
+
     @property
     def items(self):
-        return sorted(self.data.get('items', []))
+        return self._items
 
     @property
-    def selected_items(self):
-        selected_items = []
-        for i in range(self._item_list_model.rowCount()):
-            if self._item_list_model.item(i).checkState() == QtCore.Qt.Checked:
-                selected_items.append(self.items[i])
+    def spatial_index(self):
+        if self._spatial_index is None:
+            self._spatial_index = SpatialIndex(
+                self._store.bbox[self._order],
+                [item.geometry for item in self.items]
+            )
 
-        return selected_items
+        return self._spatial_index
+
+    @property
+    def selected_items(self):
+        return self._item_list_model.checked_items()
 
     @property
     def download_directory(self):
@@ -99,27 +208,134 @@ class ResultsDialog(QtWidgets.QDialog, FORM_CLASS):
             self.populate_download_directory()
 
     def on_select_all_clicked(self):
-        for i in range(self._item_list_model.rowCount()):
-            item = self._item_list_model.item(i)
-            item.setCheckState(QtCore.Qt.Checked)
+        self._item_list_model.set_all_checked(True)
 
     def on_deselect_all_clicked(self):
-        for i in range(self._item_list_model.rowCount()):
-            item = self._item_list_model.item(i)
-            item.setCheckState(QtCore.Qt.Unchecked)
+        self._item_list_model.set_all_checked(False)
+
+    def canvas_transform(self):
+        return QgsCoordinateTransform(
+            self.iface.mapCanvas().mapSettings().destinationCrs(),
+            QgsCoordinateReferenceSystem('EPSG:4326'),
+            QgsProject.instance()
+        )
+
+    def on_map_select_clicked(self):
+        extent = self.canvas_transform().transformBoundingBox(
+            self.iface.mapCanvas().extent()
+        )
+        rows = self.spatial_index.intersecting([
+            extent.xMinimum(),
+            extent.yMinimum(),
+            extent.xMaximum(),
+            extent.yMaximum()
+        ])
+        self._item_list_model.set_checked_rows(rows)
+
+    def on_point_select_clicked(self):
+        canvas = self.iface.mapCanvas()
+        if self._point_tool is None:
+            self._point_tool = QgsMapToolEmitPoint(canvas)
+            self._point_tool.canvasClicked.connect(self.on_canvas_clicked)
+
+        self._previous_map_tool = canvas.mapTool()
+        canvas.setMapTool(self._point_tool)
+
+    def on_canvas_clicked(self, point, button):
+        self.restore_map_tool()
+
+        point = self.canvas_transform().transform(point)
+        rows = self.spatial_index.covering(point.x(), point.y())
+        self._item_list_model.set_checked_rows(rows)
+
+    def restore_map_tool(self):
+        if self._point_tool is None:
+            return
+
+        canvas = self.iface.mapCanvas()
+        if canvas.mapTool() == self._point_tool:
+            if self._previous_map_tool is not None:
+                canvas.setMapTool(self._previous_map_tool)
+            else:
+                canvas.unsetMapTool(self._point_tool)
+        self._previous_map_tool = None
+
+    def on_coverage_select_clicked(self):
+        extent = self.data.get('extent', None)
+        if extent is None:
+            return
+
+        rows = self.spatial_index.overlapping(
+            extent,
+            self.coverageSpinBox.value() / 100.0
+        )
+        self._item_list_model.set_checked_rows(rows)
 
     @QtCore.pyqtSlot(QtCore.QModelIndex)
     def on_list_clicked(self, index):
         items = self.list.selectedIndexes()
         for i in items:
-            item = self.items[i.row()]
+            item = self._item_list_model.item(i.row())
             self.select_item(item)
 
+    def on_current_changed(self, current, previous):
+        if not current.isValid():
+            return
+
+        item = self._item_list_model.item(current.row())
+        if item is not self._selected_item:
+            self.select_item(item)
+        self.schedule_prefetch()
+
+    def schedule_prefetch(self, *args):
+        self._prefetch_timer.start()
+
+    def visible_rows(self):
+        count = self._item_list_model.rowCount()
+        viewport = self.list.viewport().rect()
+
+        first = self.list.indexAt(viewport.topLeft())
+        last = self.list.indexAt(viewport.bottomLeft())
+        first_row = first.row() if first.isValid() else 0
+        last_row = last.row() if last.isValid() else count - 1
+
+        return (first_row, last_row)
+
+    def prefetch_thumbnails(self):
+        count = self._item_list_model.rowCount()
+        if count == 0:
+            return
+
+        rows = []
+        current = self.list.currentIndex()
+        if current.isValid():
+            # Rows next to the current one first, for arrow key paging
+            for offset in range(1, PREFETCH_MARGIN + 1):
+                rows.extend([current.row() + offset, current.row() - offset])
+
+        first_row, last_row = self.visible_rows()
+        rows.extend(range(first_row, last_row + 1))
+        rows.extend(range(last_row + 1, last_row + PREFETCH_MARGIN + 1))
+        rows.extend(range(first_row - PREFETCH_MARGIN, first_row))
+
+        seen = set()
+        items = []
+        for row in rows:
+            if row < 0 or row >= count or row in seen:
+                continue
+            seen.add(row)
+            items.append(self._item_list_model.item(row))
+
+        self._prefetcher.prefetch(items)
+
     def select_item(self, item):
         self._selected_item = item
         self.set_preview(item, False)
         self.populate_item_details(item)
 
+        if self._footprints is not None:
+            self._footprints.flash_item(self.iface.mapCanvas(), item)
+
     def on_image_loaded(self, item, error):
         if self._selected_item != item:
             return
@@ -135,31 +351,104 @@ class ResultsDialog(QtWidgets.QDialog, FORM_CLASS):
             self.imageView.setText('Error Loading Preview')
             return
 
-        if not os.path.exists(item.thumbnail_path):
+        width = self.imageView.size().width()
+        height = self.imageView.size().height()
+        key = (item.hashed_id, width, height)
+
+        pixmap = self._previews.get(key, None)
+        if pixmap is not None:
+            self.show_preview(key, pixmap)
+            return
+
+        if self._preview_key is None \
+                or self._preview_key[0] != item.hashed_id:
+            # Keep the stale-sized image of the same item while rescaling
+            self._preview_key = None
             self.imageView.setText('Loading Preview...')
-            self.loading_thread = LoadPreviewThread(
-                item,
-                on_image_loaded=self.on_image_loaded
-            )
-            self.loading_thread.start()
+
+        if not thumbnail_cache.shared().contains(item.hashed_id):
+            self.load_preview(item)
             return
 
-        image_profile = QtGui.QImage(item.thumbnail_path)
-        image_profile = image_profile.scaled(
-            self.imageView.size().width(),
-            self.imageView.size().height(),
-            aspectRatioMode=QtCore.Qt.KeepAspectRatio,
-            transformMode=QtCore.Qt.SmoothTransformation
+        self.decode_preview(item, width, height)
+
+    def show_preview(self, key, pixmap):
+        self._preview_key = key
+        self.imageView.setPixmap(pixmap)
+
+    def decode_preview(self, item, width, height):
+        task = self._decode_task
+        if task is not None and not task.is_finished():
+            if task.item is item and (task.width, task.height) == \
+                    (width, height):
+                return
+            task.cancel()
+
+        self._decode_task = DecodeThumbnailTask(
+            item,
+            item.thumbnail_path,
+            width,
+            height,
+            on_decoded=self.on_preview_decoded
         )
-        self.imageView.setPixmap(QtGui.QPixmap.fromImage(image_profile))
+        self._decode_task.start()
+
+    def on_preview_decoded(self, item, width, height, image):
+        if image.isNull():
+            if self._selected_item is item:
+                self.imageView.setText('Error Loading Preview')
+            return
+
+        key = (item.hashed_id, width, height)
+        pixmap = QtGui.QPixmap.fromImage(image)
+        self._previews.put(key, pixmap,
+                           cost=image.width() * image.height() * 4)
+
+        if self._selected_item is not item:
+            return
+
+        size = self.imageView.size()
+        if (size.width(), size.height()) == (width, height):
+            self.show_preview(key, pixmap)
+
+    def load_preview(self, item):
+        if self._prefetcher.loading(item):
+            # on_image_loaded fires once the prefetch lands
+            return
+
+        task = self._preview_task
+        if task is not None and not task.is_finished():
+            if task.item is item:
+                return
+            # Only the selected item's preview matters; drop the old one
+            task.cancel()
+
+        self._preview_task = LoadPreviewTask(
+            item,
+            on_image_loaded=self.on_image_loaded
+        )
+        self._preview_task.start()
 
     def resizeEvent(self, event):
+        QtWidgets.QDialog.resizeEvent(self, event)
+        self._resize_timer.start()
+
+    def on_resize_settled(self):
         if self._selected_item is None:
             return
 
-        self.set_preview(self._selected_item)
+        self.set_preview(self._selected_item, False)
 
     def closeEvent(self, event):
+        self._prefetch_timer.stop()
+        self._resize_timer.stop()
+        self._prefetcher.cancel()
+        if self._decode_task is not None:
+            self._decode_task.cancel()
+        if self._preview_task is not None:
+            self._preview_task.cancel()
+        self.restore_map_tool()
+        self.disconnect_footprints()
         if event.spontaneous():
             self.hooks['on_close']()
 
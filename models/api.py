@@ -1,39 +1,53 @@
 import re
+import time
+from collections import deque
 from urllib.parse import urlparse
 from .collection import Collection
 from .link import Link
 from .search_result import SearchResult
 from ..utils import network
+from ..utils.cancellation import check
 
 
 class API:
-    def __init__(self, json=None):
+    def __init__(self, json=None, collection_loader=None):
         self._json = json
         self._data = self._json.get('data', None)
-        self._collections = [
-            Collection(self, c) for c in self._json.get('collections', [])
-        ]
+        self._updated = self._json.get('updated', None)
+        self._collection_loader = collection_loader
+        self._collections = None
+        if collection_loader is None or 'collections' in self._json:
+            self._collections = [
+                Collection(self, c) for c in self._json.get('collections', [])
+            ]
+        self._collection_index = None
+
+    def load(self, token=None):
+        self._data = network.request(f'{self.href}/stac', token=token)
 
-    def load(self):
-        self._data = network.request(f'{self.href}/stac')
-        self._collections = [
-            self.load_collection(c) for c in self.collection_ids
+        executor = network.executor()
+        futures = [
+            executor.submit(self.load_collection, c, token,
+                            host=network.host_key(self.href))
+            for c in self.collection_ids
         ]
+        try:
+            self._collections = [executor.result(f) for f in futures]
+            self._collection_index = None
+            self._updated = time.time()
+        except Exception:
+            for future in futures:
+                future.cancel()
+            raise
 
-    def load_collection(self, collection_id):
+    def load_collection(self, collection_id, token=None):
         return Collection(self,
                           network.request(
-                              f'{self.href}/collections/{collection_id}'))
-
-    def search_items(self, collections=[], bbox=[], start_time=None,
-                     end_time=None, page=1, next_page=None, limit=50,
-                     on_next_page=None, page_limit=10):
-        if page > page_limit:
-            return []
-
-        if on_next_page is not None:
-            on_next_page(self)
+                              f'{self.href}/collections/{collection_id}',
+                              token=token))
 
+    def search_body(self, collections=[], bbox=[], start_time=None,
+                    end_time=None, limit=50):
         if end_time is None:
             time = start_time.strftime('%Y-%m-%dT%H:%M:%SZ')
         else:
@@ -41,28 +55,113 @@ class API:
             end = end_time.strftime('%Y-%m-%dT%H:%M:%SZ')
             time = f'{start}/{end}'
 
-        body = {
+        return {
             'collections': [c.id for c in collections],
             'bbox': bbox,
             'time': time,
             'limit': limit
         }
 
-        if next_page is not None:
-            body['next'] = next_page
-        else:
-            body['page'] = page
+    def search_pages(self, collections=[], bbox=[], start_time=None,
+                     end_time=None, limit=50, on_next_page=None,
+                     page_limit=10, item_limit=None, prefetch_depth=1,
+                     drop_keys=(), token=None):
+        body = self.search_body(collections, bbox, start_time, end_time,
+                                limit)
+
+        def fetch(page, next_page):
+            page_body = dict(body)
+            if next_page is not None:
+                page_body['next'] = next_page
+            else:
+                page_body['page'] = page
+
+            return network.request(f'{self.href}/stac/search',
+                                   data=page_body, token=token)
+
+        executor = network.executor()
+        host = network.host_key(self.href)
+        pending = deque()
+        following = (1, None)
+        item_count = 0
+
+        try:
+            while pending or following is not None:
+                check(token)
+                if not pending:
+                    pending.append((
+                        following[0],
+                        executor.submit(fetch, *following, host=host)
+                    ))
+                following = None
+
+                if on_next_page is not None:
+                    on_next_page(self)
+
+                page, future = pending.popleft()
+                search_result = SearchResult(self, executor.result(future),
+                                             drop_keys=drop_keys)
+                next_page = search_result.next
+                page_size = search_result.page_size
 
-        search_result = SearchResult(self,
-                                     network.request(
-                                         f'{self.href}/stac/search',
-                                         data=body))
+                more_pages = (page_size >= limit
+                              and (page_limit is None or page < page_limit))
+                if not more_pages:
+                    self._cancel_pending(pending)
+                elif next_page is not None:
+                    # The next token is only known now, so request the
+                    # following page before this one is handed out
+                    if not pending:
+                        following = (page + 1, next_page)
+                else:
+                    last_page = pending[-1][0] if pending else page
+                    while len(pending) < prefetch_depth and (
+                            page_limit is None or last_page < page_limit):
+                        last_page += 1
+                        pending.append((
+                            last_page,
+                            executor.submit(fetch, last_page, None,
+                                            host=host)
+                        ))
+                    if not pending:
+                        following = (page + 1, None)
 
-        items = search_result.items
-        if len(items) >= limit:
-            items.extend(self.search_items(collections, bbox, start_time,
-                         end_time, page + 1, search_result.next, limit,
-                         on_next_page=on_next_page))
+                if following is not None and prefetch_depth > 0:
+                    pending.append((
+                        following[0],
+                        executor.submit(fetch, *following, host=host)
+                    ))
+                    following = None
+
+                items = search_result.items
+                if item_limit is not None:
+                    items = items[:item_limit - item_count]
+                item_count += len(items)
+
+                if items:
+                    yield items
+
+                if item_limit is not None and item_count >= item_limit:
+                    return
+        finally:
+            self._cancel_pending(pending)
+
+    def _cancel_pending(self, pending):
+        while pending:
+            _, future = pending.popleft()
+            future.cancel()
+
+    def search_items(self, collections=[], bbox=[], start_time=None,
+                     end_time=None, limit=50, on_next_page=None,
+                     page_limit=10, item_limit=None, prefetch_depth=1,
+                     drop_keys=(), token=None):
+        items = []
+        for page_items in self.search_pages(collections, bbox, start_time,
+                                            end_time, limit, on_next_page,
+                                            page_limit, item_limit,
+                                            prefetch_depth, drop_keys,
+                                            token):
+            items.extend(page_items)
 
         return items
 
@@ -83,6 +182,7 @@ class API:
             'id': self.id,
             'href': self.href,
             'data': self.data,
+            'updated': self.updated,
             'collections': [c.json for c in self.collections],
         }
 
@@ -102,6 +202,15 @@ class API:
     def version(self):
         return self.data.get('stac_version', None)
 
+    @property
+    def updated(self):
+        return self._updated
+
+    def expired(self, ttl):
+        if self._updated is None:
+            return True
+        return time.time() - self._updated >= ttl
+
     @property
     def description(self):
         return self.data.get('description', None)
@@ -135,7 +244,24 @@ class API:
 
     @property
     def collections(self):
+        if self._collections is None:
+            self._collections = [
+                Collection(self, c)
+                for c in self._collection_loader(self.id)
+            ]
         return self._collections
 
+    @property
+    def collections_loaded(self):
+        return self._collections is not None
+
+    def collection_by_id(self, collection_id):
+        if self._collection_index is None:
+            self._collection_index = {}
+            for collection in self.collections:
+                self._collection_index.setdefault(collection.id, collection)
+
+        return self._collection_index.get(collection_id, None)
+
     def __lt__(self, other):
         return self.title.lower() < other.title.lower()
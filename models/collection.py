@@ -2,10 +2,14 @@ from .link import Link
 
 
 class Collection:
+    __slots__ = ('_api', '_json', '_band_indices')
+
     def __init__(self, api=None, json={}):
         self._api = api
         self._json = json
 
+        self._band_indices = None
+
     @property
     def json(self):
         return self._json
@@ -58,20 +62,30 @@ class Collection:
     def bands(self):
         bands = {}
         for i, band in enumerate(self.properties.get('eo:bands', [])):
-            band['band'] = i + 1
-            bands[band.get('name', None)] = band
+            bands[band.get('name', None)] = dict(band, band=i + 1)
 
         return bands
 
+    def band_index(self, name):
+        if self._band_indices is None:
+            self._band_indices = {}
+            bands = self._json.get('properties', {}).get('eo:bands', [])
+            for i, band in enumerate(bands):
+                self._band_indices.setdefault(band.get('name', None), i)
+
+        return self._band_indices.get(name, -1)
+
     @property
     def api(self):
-        return self._pi
+        return self._api
 
     def __lt__(self, other):
         return self.title.lower() < other.title.lower()
 
 
 class Extent:
+    __slots__ = ('_json',)
+
     def __init__(self, json={}):
         self._json = json
 
@@ -85,6 +99,8 @@ class Extent:
 
 
 class Provider:
+    __slots__ = ('_json',)
+
     def __init__(self, json={}):
         self._json = json
 
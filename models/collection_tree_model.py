@@ -0,0 +1,299 @@
+from PyQt5 import QtCore
+
+
+FETCH_BATCH_SIZE = 500
+
+
+class CollectionIndex:
+    __slots__ = ('_collections', '_ids', '_keys', '_last_text',
+                 '_last_matches')
+
+    def __init__(self, collections=[]):
+        self._collections = sorted(collections)
+        self._ids = frozenset(c.id for c in self._collections)
+        self._keys = [
+            '\n'.join([
+                c.id or '',
+                c.title or '',
+                ' '.join(c.keywords or []),
+            ]).lower()
+            for c in self._collections
+        ]
+
+        self._last_text = None
+        self._last_matches = None
+
+    @property
+    def collections(self):
+        return self._collections
+
+    @property
+    def ids(self):
+        return self._ids
+
+    def matches(self, text):
+        text = text.lower()
+        terms = text.split()
+        if not terms:
+            return self._collections
+
+        # Typing forward only narrows the previous matches
+        if self._last_text is not None and text.startswith(self._last_text):
+            candidates = self._last_matches
+        else:
+            candidates = range(len(self._collections))
+
+        matches = [
+            i for i in candidates
+            if all(term in self._keys[i] for term in terms)
+        ]
+
+        self._last_text = text
+        self._last_matches = matches
+
+        return [self._collections[i] for i in matches]
+
+
+class _APINode:
+    __slots__ = ('row', 'api', 'collections', 'fetched', 'checked', '_index')
+
+    def __init__(self, row, api):
+        self.row = row
+        self.api = api
+        self.collections = None
+        self.fetched = 0
+        self.checked = set()
+
+        self._index = None
+
+    @property
+    def index(self):
+        if self._index is None:
+            self._index = CollectionIndex(self.api.collections)
+        return self._index
+
+    def set_api(self, api):
+        self.api = api
+        self._index = None
+        self.checked &= self.index.ids
+
+    @property
+    def check_state(self):
+        # checked only ever holds ids from the index
+        if not self.checked:
+            return QtCore.Qt.Unchecked
+        if len(self.checked) >= len(self.index.ids):
+            return QtCore.Qt.Checked
+        return QtCore.Qt.PartiallyChecked
+
+
+class CollectionTreeModel(QtCore.QAbstractItemModel):
+    def __init__(self, apis=[], parent=None):
+        super(CollectionTreeModel, self).__init__(parent)
+
+        self._nodes = [
+            _APINode(row, api) for row, api in enumerate(sorted(apis))
+        ]
+        self._filter = ''
+
+    def api(self, row):
+        return self._nodes[row].api
+
+    def index(self, row, column, parent=QtCore.QModelIndex()):
+        if not self.hasIndex(row, column, parent):
+            return QtCore.QModelIndex()
+
+        if not parent.isValid():
+            return self.createIndex(row, column)
+
+        # Collection rows point at their API node
+        return self.createIndex(row, column, self._nodes[parent.row()])
+
+    def parent(self, index):
+        if not index.isValid():
+            return QtCore.QModelIndex()
+
+        node = index.internalPointer()
+        if node is None:
+            return QtCore.QModelIndex()
+
+        return self.createIndex(node.row, 0)
+
+    def rowCount(self, parent=QtCore.QModelIndex()):
+        if not parent.isValid():
+            return len(self._nodes)
+
+        if parent.internalPointer() is not None:
+            return 0
+
+        return self._nodes[parent.row()].fetched
+
+    def columnCount(self, parent=QtCore.QModelIndex()):
+        return 1
+
+    def hasChildren(self, parent=QtCore.QModelIndex()):
+        if not parent.isValid():
+            return len(self._nodes) > 0
+
+        if parent.internalPointer() is not None:
+            return False
+
+        node = self._nodes[parent.row()]
+        if node.collections is None:
+            return True
+        return len(node.collections) > 0
+
+    def canFetchMore(self, parent=QtCore.QModelIndex()):
+        if not parent.isValid() or parent.internalPointer() is not None:
+            return False
+
+        node = self._nodes[parent.row()]
+        if node.collections is None:
+            return True
+        return node.fetched < len(node.collections)
+
+    def fetchMore(self, parent=QtCore.QModelIndex()):
+        if not parent.isValid() or parent.internalPointer() is not None:
+            return
+
+        node = self._nodes[parent.row()]
+        if node.collections is None:
+            node.collections = node.index.matches(self._filter)
+
+        count = min(FETCH_BATCH_SIZE, len(node.collections) - node.fetched)
+        if count <= 0:
+            return
+
+        self.beginInsertRows(parent, node.fetched, node.fetched + count - 1)
+        node.fetched += count
+        self.endInsertRows()
+
+    def data(self, index, role=QtCore.Qt.DisplayRole):
+        if not index.isValid():
+            return None
+
+        node = index.internalPointer()
+        if node is None:
+            node = self._nodes[index.row()]
+            if role == QtCore.Qt.DisplayRole:
+                return f'{node.api.title}'
+            if role == QtCore.Qt.CheckStateRole:
+                return node.check_state
+            return None
+
+        collection = node.collections[index.row()]
+        if role == QtCore.Qt.DisplayRole:
+            return collection.title.replace('\n', ' ')
+        if role == QtCore.Qt.ToolTipRole:
+            return collection.id
+        if role == QtCore.Qt.CheckStateRole:
+            if collection.id in node.checked:
+                return QtCore.Qt.Checked
+            return QtCore.Qt.Unchecked
+
+        return None
+
+    def flags(self, index):
+        if not index.isValid():
+            return QtCore.Qt.NoItemFlags
+
+        return (QtCore.Qt.ItemIsEnabled
+                | QtCore.Qt.ItemIsSelectable
+                | QtCore.Qt.ItemIsUserCheckable)
+
+    def setData(self, index, value, role=QtCore.Qt.EditRole):
+        if not index.isValid() or role != QtCore.Qt.CheckStateRole:
+            return False
+
+        checked = value == QtCore.Qt.Checked
+        node = index.internalPointer()
+
+        if node is None:
+            node = self._nodes[index.row()]
+            # Only the collections that pass the filter are toggled
+            ids = set(c.id for c in node.index.matches(self._filter))
+            if checked:
+                node.checked |= ids
+            else:
+                node.checked -= ids
+        else:
+            collection_id = node.collections[index.row()].id
+            if checked:
+                node.checked.add(collection_id)
+            else:
+                node.checked.discard(collection_id)
+
+        self.checks_changed(node)
+        return True
+
+    def checks_changed(self, node):
+        api_index = self.createIndex(node.row, 0)
+        self.dataChanged.emit(api_index, api_index,
+                              [QtCore.Qt.CheckStateRole])
+
+        if node.fetched > 0:
+            self.dataChanged.emit(
+                self.index(0, 0, api_index),
+                self.index(node.fetched - 1, 0, api_index),
+                [QtCore.Qt.CheckStateRole]
+            )
+
+    def set_filter(self, text):
+        self._filter = text
+
+        for node in self._nodes:
+            if node.collections is None and not text.strip():
+                # Left for fetchMore once the node is expanded
+                continue
+
+            self.reset_rows(node, node.index.matches(text))
+
+    def reset_rows(self, node, collections):
+        parent = self.createIndex(node.row, 0)
+        fetched = node.fetched
+
+        if fetched > 0:
+            self.beginRemoveRows(parent, 0, fetched - 1)
+            node.fetched = 0
+            node.collections = collections
+            self.endRemoveRows()
+        else:
+            node.collections = collections
+
+        # Views do not fetch again for a node that is already expanded
+        count = min(max(fetched, FETCH_BATCH_SIZE), len(collections))
+        if count > 0:
+            self.beginInsertRows(parent, 0, count - 1)
+            node.fetched = count
+            self.endInsertRows()
+
+    def update_api(self, api):
+        for node in self._nodes:
+            if node.api.id == api.id:
+                break
+        else:
+            return
+
+        node.set_api(api)
+        if node.collections is not None:
+            self.reset_rows(node, node.index.matches(self._filter))
+
+        self.checks_changed(node)
+        api_index = self.createIndex(node.row, 0)
+        self.dataChanged.emit(api_index, api_index,
+                              [QtCore.Qt.DisplayRole])
+
+    def selections(self):
+        api_collections = []
+        for node in self._nodes:
+            if not node.checked:
+                continue
+
+            api_collections.append({
+                'api': node.api,
+                'collections': [
+                    c for c in node.index.collections if c.id in node.checked
+                ]
+            })
+
+        return api_collections
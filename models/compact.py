@@ -0,0 +1,42 @@
+import sys
+
+
+INTERNED_VALUE_KEYS = frozenset([
+    'type',
+    'rel',
+    'title',
+    'collection',
+    'eo:name',
+    'eo:platform',
+    'eo:instrument',
+    'eo:constellation',
+    'platform',
+    'instrument',
+    'constellation',
+    'roles',
+])
+
+
+def compact(json, drop_keys=()):
+    return {
+        sys.intern(key): _compact_value(key, value)
+        for key, value in json.items()
+        if key not in drop_keys
+    }
+
+
+def _compact_value(key, value):
+    if isinstance(value, str):
+        if key in INTERNED_VALUE_KEYS:
+            return sys.intern(value)
+        return value
+
+    if isinstance(value, dict):
+        return {
+            sys.intern(k): _compact_value(k, v) for k, v in value.items()
+        }
+
+    if isinstance(value, list):
+        return [_compact_value(key, v) for v in value]
+
+    return value
@@ -1,22 +1,48 @@
 import os
 import subprocess
 import hashlib
-import tempfile
-from ..utils import network
+from ..utils import thumbnail_cache
 from ..models.link import Link
 
 
 class Item:
+    __slots__ = (
+        '_api',
+        '_json',
+        '_hashed_id',
+        '_assets',
+        '_assets_by_key',
+        '_collection',
+        '_collection_resolved',
+    )
+
     def __init__(self, api=None, json={}):
         self._api = api
         self._json = json
 
+        self._hashed_id = None
+        self._assets = None
+        self._assets_by_key = None
+        self._collection = None
+        self._collection_resolved = False
+
     @property
     def hashed_id(self):
-        return hashlib.sha256(
-            f'{self.api.href}/collections/{self.collection.id}/items/{self.id}'
-            .encode('utf-8')
-        ).hexdigest()
+        if self._hashed_id is None:
+            collection_id = None
+            if self.collection is not None:
+                collection_id = self.collection.id
+
+            self._hashed_id = hashlib.sha256(
+                f'{self.api.href}/collections/{collection_id}/items/{self.id}'
+                .encode('utf-8')
+            ).hexdigest()
+
+        return self._hashed_id
+
+    @property
+    def json(self):
+        return self._json
 
     @property
     def api(self):
@@ -48,30 +74,39 @@ class Item:
 
     @property
     def assets(self):
-        assets = []
-        for key, d in self._json.get('assets', {}).items():
-            assets.append(Asset(key, d, item=self))
+        if self._assets is None:
+            self._assets = [
+                Asset(key, d, item=self)
+                for key, d in self._json.get('assets', {}).items()
+            ]
+
+        return self._assets
+
+    def asset(self, key):
+        if self._assets_by_key is None:
+            self._assets_by_key = {a.key: a for a in self.assets}
 
-        return assets
+        return self._assets_by_key.get(key, None)
 
     @property
-    def collection(self):
+    def collection_id(self):
         collection_id = self.properties.get('collection', None)
         if collection_id is None:
             collection_id = self._json.get('collection', None)
 
-        for collection in self.api.collections:
-            if collection.id == collection_id:
-                return collection
+        return collection_id
 
-        return None
+    @property
+    def collection(self):
+        if not self._collection_resolved:
+            self._collection = self.api.collection_by_id(self.collection_id)
+            self._collection_resolved = True
+
+        return self._collection
 
     @property
     def thumbnail(self):
-        for asset in self.assets:
-            if asset.key == 'thumbnail':
-                return asset
-        return None
+        return self.asset('thumbnail')
 
     @property
     def thumbnail_url(self):
@@ -80,91 +115,80 @@ class Item:
 
         return self.thumbnail.href
 
-    @property
-    def temp_dir(self):
-        temp_dir = os.path.join(
-            tempfile.gettempdir(),
-            'qgis-stac-browser',
-            self.hashed_id
-        )
-        if not os.path.exists(temp_dir):
-            os.makedirs(temp_dir)
-
-        return temp_dir
-
     @property
     def thumbnail_path(self):
-        return os.path.join(self.temp_dir, 'thumbnail.jpg')
+        return thumbnail_cache.shared().path(self.hashed_id)
 
     def thumbnail_downloaded(self):
         return self._thumbnail is not None
 
-    def download_steps(self, options):
-        steps = 0
-
-        for asset_key in options.get('assets', []):
-            for asset in self.assets:
-                if asset.key != asset_key:
-                    continue
-
-                if options.get('stream_cogs', False) and asset.cog is not None:
-                    continue
-
-                steps += 1
-
-        if options.get('add_to_layers', False):
-            steps += 1
-        return steps
-
-    def download(self, gdal_path, options, download_directory, on_update=None):
+    def download_plan(self, options, download_directory):
         item_download_directory = os.path.join(download_directory, self.id)
         if not os.path.exists(item_download_directory):
             os.makedirs(item_download_directory)
 
+        downloads = []
         raster_filenames = []
 
-        for asset_key in options.get('assets', []):
-            for asset in self.assets:
-                if asset.key != asset_key:
-                    continue
-
-                if options.get('stream_cogs', False) and asset.cog is not None:
-                    raster_filenames.append(asset.cog)
-                    continue
-
-                if on_update is not None:
-                    on_update(f'Downloading {asset.href}')
-
-                temp_filename = os.path.join(
-                    item_download_directory,
-                    asset.href.split('/')[-1]
-                )
-                if asset.is_raster:
-                    raster_filenames.append(temp_filename)
-                network.download(asset.href, temp_filename)
-
-        if options.get('add_to_layers', False):
-            if on_update is not None:
-                on_update(f'Building Virtual Raster...')
-
-            arguments = [
-                os.path.join(gdal_path, 'gdalbuildvrt'),
-                '-separate',
-                os.path.join(download_directory, f'{self.id}.vrt')
-            ]
-            arguments.extend(raster_filenames)
-            subprocess.run(arguments)
+        stream_cogs = options.get('stream_cogs', False)
+        assets = [
+            asset for asset in
+            (self.asset(asset_key) for asset_key in options.get('assets', []))
+            if asset is not None
+        ]
+        basenames = [
+            asset.href.split('/')[-1] for asset in assets
+            if not (stream_cogs and asset.cog is not None)
+        ]
+        filenames = set()
+
+        for asset in assets:
+            if stream_cogs and asset.cog is not None:
+                raster_filenames.append(asset.cog)
+                continue
+
+            basename = asset.href.split('/')[-1]
+            # Assets often share a basename (B04/data.tif, B08/data.tif)
+            filename = basename
+            if basenames.count(basename) > 1:
+                filename = f'{asset.key}-{basename}'
+            stem, extension = os.path.splitext(filename)
+            suffix = 1
+            while filename in filenames:
+                filename = f'{stem}-{suffix}{extension}'
+                suffix += 1
+            filenames.add(filename)
+
+            temp_filename = os.path.join(item_download_directory, filename)
+            if asset.is_raster:
+                raster_filenames.append(temp_filename)
+            downloads.append((asset, temp_filename))
+
+        return (downloads, raster_filenames)
+
+    def build_vrt(self, gdal_path, download_directory, raster_filenames):
+        arguments = [
+            os.path.join(gdal_path, 'gdalbuildvrt'),
+            '-separate',
+            os.path.join(download_directory, f'{self.id}.vrt')
+        ]
+        arguments.extend(raster_filenames)
+        subprocess.run(arguments)
 
     def __lt__(self, other):
         return self.id < other.id
 
 
 class Asset:
+    __slots__ = ('_key', '_json', '_item', '_band')
+
     def __init__(self, key, json={}, item=None):
         self._key = key
         self._json = json
         self._item = item
 
+        self._band = None
+
     @property
     def is_raster(self):
         return (self._json.get('eo:name', None) is not None)
@@ -184,6 +208,14 @@ class Asset:
     def href(self):
         return self._json.get('href', None)
 
+    @property
+    def size(self):
+        return self._json.get('file:size', None)
+
+    @property
+    def checksum(self):
+        return self._json.get('file:checksum', None)
+
     @property
     def title(self):
         return self._json.get('title', None)
@@ -201,25 +233,24 @@ class Asset:
 
     @property
     def band(self):
-        if self._item.collection is None:
-            return -1
-
-        collection_bands = self._item.collection.properties.get('eo:bands', [])
+        if self._band is None:
+            self._band = -1
+            if self._item.collection is not None:
+                self._band = self._item.collection.band_index(self.key)
 
-        for i, c in enumerate(collection_bands):
-            if c.get('name', None) == self.key:
-                return i
-
-        return -1
+        return self._band
 
     def __lt__(self, other):
-        if self.band != -1 and other.band != -1:
-            return self.band < other.band
+        band = self.band
+        other_band = other.band
+
+        if band != -1 and other_band != -1:
+            return band < other_band
 
-        if self.band == -1 and other.band != -1:
+        if band == -1 and other_band != -1:
             return False
 
-        if self.band != -1 and other.band == -1:
+        if band != -1 and other_band == -1:
             return True
 
         if self.title is None or other.title is None:
@@ -0,0 +1,130 @@
+import numpy as np
+
+from PyQt5 import QtCore
+
+
+FETCH_BATCH_SIZE = 1000
+
+
+class ItemListModel(QtCore.QAbstractListModel):
+    checked_changed = QtCore.pyqtSignal()
+
+    def __init__(self, items=[], parent=None):
+        super(ItemListModel, self).__init__(parent)
+
+        self._items = items
+        self._checked = bytearray((len(items) + 7) // 8)
+        self._loaded = 0
+
+    @property
+    def items(self):
+        return self._items
+
+    def item(self, row):
+        return self._items[row]
+
+    def rowCount(self, parent=QtCore.QModelIndex()):
+        if parent.isValid():
+            return 0
+        return self._loaded
+
+    def canFetchMore(self, parent=QtCore.QModelIndex()):
+        if parent.isValid():
+            return False
+        return self._loaded < len(self._items)
+
+    def fetchMore(self, parent=QtCore.QModelIndex()):
+        if parent.isValid():
+            return
+
+        count = min(FETCH_BATCH_SIZE, len(self._items) - self._loaded)
+        if count <= 0:
+            return
+
+        self.beginInsertRows(QtCore.QModelIndex(), self._loaded,
+                             self._loaded + count - 1)
+        self._loaded += count
+        self.endInsertRows()
+
+    def data(self, index, role=QtCore.Qt.DisplayRole):
+        if not index.isValid():
+            return None
+
+        row = index.row()
+        if role == QtCore.Qt.DisplayRole:
+            return self._items[row].id
+
+        if role == QtCore.Qt.CheckStateRole:
+            if self.is_checked(row):
+                return QtCore.Qt.Checked
+            return QtCore.Qt.Unchecked
+
+        return None
+
+    def flags(self, index):
+        if not index.isValid():
+            return QtCore.Qt.NoItemFlags
+
+        return (QtCore.Qt.ItemIsEnabled
+                | QtCore.Qt.ItemIsSelectable
+                | QtCore.Qt.ItemIsUserCheckable)
+
+    def setData(self, index, value, role=QtCore.Qt.EditRole):
+        if not index.isValid() or role != QtCore.Qt.CheckStateRole:
+            return False
+
+        self.set_checked(index.row(), value == QtCore.Qt.Checked)
+        return True
+
+    def is_checked(self, row):
+        return bool(self._checked[row >> 3] & (1 << (row & 7)))
+
+    def set_checked(self, row, checked):
+        if checked:
+            self._checked[row >> 3] |= (1 << (row & 7))
+        else:
+            self._checked[row >> 3] &= ~(1 << (row & 7)) & 0xFF
+
+        if row < self._loaded:
+            index = self.index(row)
+            self.dataChanged.emit(index, index, [QtCore.Qt.CheckStateRole])
+        self.checked_changed.emit()
+
+    def set_all_checked(self, checked):
+        fill = 0xFF if checked else 0x00
+        self._checked[:] = bytes([fill]) * len(self._checked)
+
+        remainder = len(self._items) & 7
+        if checked and remainder:
+            self._checked[-1] = (1 << remainder) - 1
+
+        if self._loaded > 0:
+            self.dataChanged.emit(
+                self.index(0),
+                self.index(self._loaded - 1),
+                [QtCore.Qt.CheckStateRole]
+            )
+        self.checked_changed.emit()
+
+    def set_checked_rows(self, rows):
+        bits = np.zeros(len(self._checked) * 8, dtype=bool)
+        bits[np.asarray(rows, dtype=np.int64)] = True
+        self._checked[:] = np.packbits(bits, bitorder='little').tobytes()
+
+        if self._loaded > 0:
+            self.dataChanged.emit(
+                self.index(0),
+                self.index(self._loaded - 1),
+                [QtCore.Qt.CheckStateRole]
+            )
+        self.checked_changed.emit()
+
+    def checked_rows(self):
+        bits = np.unpackbits(
+            np.frombuffer(bytes(self._checked), dtype=np.uint8),
+            bitorder='little'
+        )
+        return np.flatnonzero(bits[:len(self._items)])
+
+    def checked_items(self):
+        return [self._items[row] for row in self.checked_rows()]
@@ -0,0 +1,231 @@
+import re
+import calendar
+
+import numpy as np
+
+
+MISSING_DATETIME = np.iinfo(np.int64).min
+
+DATETIME_PATTERN = re.compile(
+    r'^(\d{4})-(\d{2})-(\d{2})'
+    r'(?:[T ](\d{2}):(\d{2})(?::(\d{2})(?:\.\d+)?)?)?'
+    r'(Z|[+-]\d{2}:?\d{2})?$'
+)
+
+
+def parse_datetime(value):
+    if not isinstance(value, str):
+        return MISSING_DATETIME
+
+    m = DATETIME_PATTERN.match(value.strip())
+    if m is None:
+        return MISSING_DATETIME
+
+    year, month, day, hour, minute, second, offset = m.groups()
+    try:
+        timestamp = calendar.timegm((
+            int(year),
+            int(month),
+            int(day),
+            int(hour or 0),
+            int(minute or 0),
+            int(second or 0)
+        ))
+    except ValueError:
+        return MISSING_DATETIME
+
+    if offset is not None and offset != 'Z':
+        offset = offset.replace(':', '')
+        sign = -1 if offset[0] == '-' else 1
+        timestamp -= sign * (int(offset[1:3]) * 3600 + int(offset[3:5]) * 60)
+
+    return timestamp
+
+
+def to_number(value):
+    if isinstance(value, bool):
+        return np.nan
+
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return np.nan
+
+
+class ItemStore:
+    def __init__(self, items=[]):
+        self._items = []
+        self._pending = []
+
+        self._ids = np.empty(0, dtype=object)
+        self._bbox = np.empty((0, 4), dtype=np.float64)
+        self._datetime = np.empty(0, dtype=np.int64)
+        self._columns = {}
+        self._index = {}
+
+        self.extend(items)
+
+    def extend(self, items):
+        self._pending.extend(items)
+
+    def __len__(self):
+        return len(self._items) + len(self._pending)
+
+    @property
+    def items(self):
+        self._build()
+        return self._items
+
+    @property
+    def ids(self):
+        self._build()
+        return self._ids
+
+    @property
+    def bbox(self):
+        self._build()
+        return self._bbox
+
+    @property
+    def datetime(self):
+        self._build()
+        return self._datetime
+
+    @property
+    def cloud_cover(self):
+        return self.column('eo:cloud_cover')
+
+    def column(self, name):
+        self._build()
+        column = self._columns.get(name, None)
+        if column is None:
+            column = np.fromiter(
+                (to_number(i.properties.get(name, None)) for i in self._items),
+                dtype=np.float64,
+                count=len(self._items)
+            )
+            self._columns[name] = column
+
+        return column
+
+    def row(self, item_id):
+        self._build()
+        return self._index.get(item_id, None)
+
+    def item(self, row):
+        return self.items[row]
+
+    def take(self, rows):
+        items = self.items
+        return [items[i] for i in rows]
+
+    def argsort(self, key='id', descending=False):
+        if key == 'id':
+            values = self.ids
+        elif key == 'datetime':
+            values = self.datetime
+        else:
+            values = self.column(key)
+
+        rows = np.argsort(values, kind='stable')
+        if descending:
+            rows = rows[::-1]
+
+        return rows
+
+    def sorted_items(self, key='id', descending=False):
+        return self.take(self.argsort(key, descending))
+
+    def mask(self, bbox=None, start_time=None, end_time=None,
+             max_cloud_cover=None, collection_ids=None):
+        self._build()
+        mask = np.ones(len(self._items), dtype=bool)
+
+        if bbox is not None:
+            xmin, ymin, xmax, ymax = bbox
+            mask &= ((self._bbox[:, 0] <= xmax)
+                     & (self._bbox[:, 2] >= xmin)
+                     & (self._bbox[:, 1] <= ymax)
+                     & (self._bbox[:, 3] >= ymin))
+
+        if start_time is not None:
+            mask &= self._datetime >= calendar.timegm(start_time.timetuple())
+
+        if end_time is not None:
+            mask &= ((self._datetime != MISSING_DATETIME)
+                     & (self._datetime <= calendar.timegm(
+                         end_time.timetuple())))
+
+        if max_cloud_cover is not None:
+            mask &= self.cloud_cover <= max_cloud_cover
+
+        if collection_ids is not None:
+            collection_ids = set(collection_ids)
+            mask &= np.fromiter(
+                (i.collection_id in collection_ids for i in self._items),
+                dtype=bool,
+                count=len(self._items)
+            )
+
+        return mask
+
+    def filter(self, **kwargs):
+        return ItemStore(self.take(np.flatnonzero(self.mask(**kwargs))))
+
+    def aggregate(self):
+        self._build()
+        datetimes = self._datetime[self._datetime != MISSING_DATETIME]
+        cloud_cover = self.cloud_cover[~np.isnan(self.cloud_cover)]
+        bbox = self._bbox[~np.isnan(self._bbox).any(axis=1)]
+
+        return {
+            'count': len(self._items),
+            'start_time': int(datetimes.min()) if len(datetimes) else None,
+            'end_time': int(datetimes.max()) if len(datetimes) else None,
+            'mean_cloud_cover': (float(cloud_cover.mean())
+                                 if len(cloud_cover) else None),
+            'bbox': ([
+                float(bbox[:, 0].min()),
+                float(bbox[:, 1].min()),
+                float(bbox[:, 2].max()),
+                float(bbox[:, 3].max())
+            ] if len(bbox) else None),
+        }
+
+    def _build(self):
+        if not self._pending:
+            return
+
+        pending, self._pending = self._pending, []
+        offset = len(self._items)
+        count = len(pending)
+
+        ids = np.empty(count, dtype=object)
+        ids[:] = [i.id for i in pending]
+
+        bbox = np.full((count, 4), np.nan, dtype=np.float64)
+        for row, item in enumerate(pending):
+            item_bbox = item.bbox
+            if item_bbox is None:
+                continue
+            if len(item_bbox) == 6:
+                item_bbox = [item_bbox[0], item_bbox[1],
+                             item_bbox[3], item_bbox[4]]
+            if len(item_bbox) == 4:
+                bbox[row] = item_bbox
+
+        datetimes = np.fromiter(
+            (parse_datetime(i.properties.get('datetime', None))
+             for i in pending),
+            dtype=np.int64,
+            count=count
+        )
+
+        for row, item in enumerate(pending):
+            self._index.setdefault(item.id, offset + row)
+
+        self._items.extend(pending)
+        self._ids = np.concatenate((self._ids, ids))
+        self._bbox = np.concatenate((self._bbox, bbox))
+        self._datetime = np.concatenate((self._datetime, datetimes))
+        self._columns = {}
@@ -1,4 +1,6 @@
 class Link:
+    __slots__ = ('_json',)
+
     def __init__(self, json={}):
         self._json = json
 
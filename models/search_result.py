@@ -1,11 +1,15 @@
 from .item import Item
 from .link import Link
+from .compact import compact
 
 
 class SearchResult:
-    def __init__(self, api=None, json={}):
+    __slots__ = ('_api', '_json', '_drop_keys')
+
+    def __init__(self, api=None, json={}, drop_keys=()):
         self._api = api
         self._json = json
+        self._drop_keys = drop_keys
 
     @property
     def api(self):
@@ -26,9 +30,16 @@ class SearchResult:
 
         return self._json.get('search:metadata', {}).get('next', None)
 
+    @property
+    def page_size(self):
+        return len(self._json.get('features', []))
+
     @property
     def items(self):
-        return [Item(self.api, f) for f in self._json.get('features', [])]
+        return [
+            Item(self.api, compact(f, self._drop_keys))
+            for f in self._json.get('features', [])
+        ]
 
     @property
     def links(self):
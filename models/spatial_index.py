@@ -0,0 +1,237 @@
+import math
+
+import numpy as np
+
+
+NODE_CAPACITY = 16
+
+
+def polygons(geometry):
+    if geometry is None:
+        return []
+
+    if geometry.get('type', None) == 'Polygon':
+        return [geometry.get('coordinates', [])]
+
+    if geometry.get('type', None) == 'MultiPolygon':
+        return geometry.get('coordinates', [])
+
+    return []
+
+
+def ring_area(ring):
+    area = 0.0
+    for i in range(len(ring) - 1):
+        area += ring[i][0] * ring[i + 1][1] - ring[i + 1][0] * ring[i][1]
+    if len(ring) > 2 and ring[0] != ring[-1]:
+        area += ring[-1][0] * ring[0][1] - ring[0][0] * ring[-1][1]
+    return abs(area) / 2.0
+
+
+def clip_ring(ring, rect):
+    xmin, ymin, xmax, ymax = rect
+    edges = [
+        lambda p: p[0] >= xmin,
+        lambda p: p[0] <= xmax,
+        lambda p: p[1] >= ymin,
+        lambda p: p[1] <= ymax,
+    ]
+    bounds = [(0, xmin), (0, xmax), (1, ymin), (1, ymax)]
+
+    points = [tuple(p[:2]) for p in ring]
+    if len(points) > 1 and points[0] == points[-1]:
+        points = points[:-1]
+
+    for inside, (axis, value) in zip(edges, bounds):
+        if not points:
+            break
+
+        clipped = []
+        previous = points[-1]
+        for current in points:
+            if inside(current):
+                if not inside(previous):
+                    clipped.append(_intersect(previous, current, axis, value))
+                clipped.append(current)
+            elif inside(previous):
+                clipped.append(_intersect(previous, current, axis, value))
+            previous = current
+        points = clipped
+
+    return points
+
+
+def _intersect(a, b, axis, value):
+    t = (value - a[axis]) / (b[axis] - a[axis])
+    if axis == 0:
+        return (value, a[1] + t * (b[1] - a[1]))
+    return (a[0] + t * (b[0] - a[0]), value)
+
+
+def geometry_area(geometry):
+    area = 0.0
+    for polygon in polygons(geometry):
+        if not polygon:
+            continue
+        area += ring_area(polygon[0])
+        area -= sum(ring_area(hole) for hole in polygon[1:])
+    return area
+
+
+def clipped_area(geometry, rect):
+    area = 0.0
+    for polygon in polygons(geometry):
+        if not polygon:
+            continue
+        area += ring_area(clip_ring(polygon[0], rect))
+        area -= sum(ring_area(clip_ring(hole, rect)) for hole in polygon[1:])
+    return area
+
+
+def ring_contains(ring, x, y):
+    inside = False
+    j = len(ring) - 1
+    for i in range(len(ring)):
+        xi, yi = ring[i][0], ring[i][1]
+        xj, yj = ring[j][0], ring[j][1]
+        if (yi > y) != (yj > y) \
+                and x < (xj - xi) * (y - yi) / (yj - yi) + xi:
+            inside = not inside
+        j = i
+    return inside
+
+
+def geometry_contains(geometry, x, y):
+    for polygon in polygons(geometry):
+        if not polygon or not ring_contains(polygon[0], x, y):
+            continue
+        if not any(ring_contains(hole, x, y) for hole in polygon[1:]):
+            return True
+    return False
+
+
+class SpatialIndex:
+    def __init__(self, bboxes, geometries=None, node_capacity=NODE_CAPACITY):
+        bboxes = np.asarray(bboxes, dtype=np.float64).reshape(-1, 4)
+
+        self._geometries = geometries
+        self._capacity = node_capacity
+
+        rows = np.flatnonzero(~np.isnan(bboxes).any(axis=1))
+        order = self._str_order(bboxes[rows])
+        self._rows = rows[order]
+        self._boxes = bboxes[self._rows]
+
+        self._levels = []
+        current = self._boxes
+        while len(current) > node_capacity:
+            starts = np.arange(0, len(current), node_capacity)
+            current = np.column_stack((
+                np.minimum.reduceat(current[:, 0], starts),
+                np.minimum.reduceat(current[:, 1], starts),
+                np.maximum.reduceat(current[:, 2], starts),
+                np.maximum.reduceat(current[:, 3], starts),
+            ))
+            self._levels.append(current)
+        self._levels.reverse()
+
+    def __len__(self):
+        return len(self._rows)
+
+    def _str_order(self, boxes):
+        count = len(boxes)
+        if count == 0:
+            return np.empty(0, dtype=np.int64)
+
+        leaves = math.ceil(count / self._capacity)
+        slice_size = math.ceil(math.sqrt(leaves)) * self._capacity
+
+        cx = (boxes[:, 0] + boxes[:, 2]) / 2.0
+        cy = (boxes[:, 1] + boxes[:, 3]) / 2.0
+
+        x_rank = np.empty(count, dtype=np.int64)
+        x_rank[np.argsort(cx, kind='stable')] = np.arange(count)
+        return np.lexsort((cy, x_rank // slice_size))
+
+    def _search(self, xmin, ymin, xmax, ymax):
+        candidates = None
+        for level in self._levels + [self._boxes]:
+            if candidates is None:
+                candidates = np.arange(len(level))
+            else:
+                candidates = (candidates[:, None] * self._capacity
+                              + np.arange(self._capacity)).ravel()
+                candidates = candidates[candidates < len(level)]
+
+            boxes = level[candidates]
+            candidates = candidates[(boxes[:, 0] <= xmax)
+                                    & (boxes[:, 2] >= xmin)
+                                    & (boxes[:, 1] <= ymax)
+                                    & (boxes[:, 3] >= ymin)]
+            if len(candidates) == 0:
+                break
+
+        if candidates is None:
+            return np.empty(0, dtype=np.int64)
+
+        return candidates
+
+    def _geometry(self, row):
+        if self._geometries is None:
+            return None
+        return self._geometries[row]
+
+    def intersecting(self, rect, exact=True):
+        hits = self._search(*rect)
+        rows = self._rows[hits]
+        if not exact:
+            return np.sort(rows)
+
+        keep = []
+        for hit, row in zip(hits, rows):
+            geometry = self._geometry(row)
+            if geometry is None or not polygons(geometry):
+                keep.append(row)
+                continue
+
+            box = self._boxes[hit]
+            if box[0] >= rect[0] and box[2] <= rect[2] \
+                    and box[1] >= rect[1] and box[3] <= rect[3]:
+                keep.append(row)
+            elif clipped_area(geometry, rect) > 0:
+                keep.append(row)
+
+        return np.sort(np.asarray(keep, dtype=np.int64))
+
+    def covering(self, x, y):
+        hits = self._search(x, y, x, y)
+        rows = []
+        for row in self._rows[hits]:
+            geometry = self._geometry(row)
+            if geometry is None or not polygons(geometry) \
+                    or geometry_contains(geometry, x, y):
+                rows.append(row)
+
+        return np.sort(np.asarray(rows, dtype=np.int64))
+
+    def overlapping(self, rect, min_fraction):
+        rect_area = (rect[2] - rect[0]) * (rect[3] - rect[1])
+        if rect_area <= 0:
+            return self.covering(rect[0], rect[1])
+
+        hits = self._search(*rect)
+        rows = []
+        for hit, row in zip(hits, self._rows[hits]):
+            geometry = self._geometry(row)
+            if geometry is not None and polygons(geometry):
+                area = clipped_area(geometry, rect)
+            else:
+                box = self._boxes[hit]
+                width = min(box[2], rect[2]) - max(box[0], rect[0])
+                height = min(box[3], rect[3]) - max(box[1], rect[1])
+                area = max(0.0, width) * max(0.0, height)
+
+            if area / rect_area >= min_fraction:
+                rows.append(row)
+
+        return np.sort(np.asarray(rows, dtype=np.int64))
@@ -1,4 +1,3 @@
-import time
 import os.path
 import sys
 
@@ -6,7 +5,6 @@ from PyQt5.QtGui import QIcon
 from PyQt5.QtWidgets import QAction
 
 from .resources import *
-from .controllers.collection_loading_dialog import CollectionLoadingDialog
 from .controllers.query_dialog import QueryDialog
 from .controllers.item_loading_dialog import ItemLoadingDialog
 from .controllers.results_dialog import ResultsDialog
@@ -14,8 +12,11 @@ from .controllers.downloading_controller import DownloadController
 from .controllers.download_selection_dialog import DownloadSelectionDialog
 from .controllers.configure_apis_dialog import ConfigureAPIDialog
 from .controllers.about_dialog import AboutDialog
-from .utils.config import Config
-from .utils.logging import error
+from .controllers.footprint_layer import FootprintLayer
+from .models.api import API
+from .threads.load_collections_task import LoadCollectionsTask
+from .utils.config import shared_config
+from .utils.logging import error, warning
 
 
 class STACBrowser:
@@ -27,18 +28,12 @@ class STACBrowser:
         self.application = None
         self.menu = u'&STAC Browser'
 
-        self.current_window = 'COLLECTION_LOADING'
+        self.current_window = 'QUERY'
+        self.footprints = FootprintLayer()
+        self.show_footprints = False
+        self.refresh_task = None
 
         self.windows = {
-            'COLLECTION_LOADING': {
-                'class': CollectionLoadingDialog,
-                'hooks': {
-                    'on_finished': self.collection_load_finished,
-                    'on_close': self.on_close
-                },
-                'data': None,
-                'dialog': None
-            },
             'QUERY': {
                 'class': QueryDialog,
                 'hooks': {
@@ -53,6 +48,7 @@ class STACBrowser:
                 'hooks': {
                     'on_close': self.on_close,
                     'on_finished': self.item_load_finished,
+                    'on_page': self.on_items_page,
                     'on_error': self.results_error
                 },
                 'data': None,
@@ -88,10 +84,18 @@ class STACBrowser:
             'start_time': start_time,
             'end_time': end_time
         }
+        self.show_footprints = shared_config().show_footprints
+        if self.show_footprints:
+            self.footprints.clear()
+
         self.current_window = 'ITEM_LOADING'
         self.windows['QUERY']['dialog'].close()
         self.load_window()
 
+    def on_items_page(self, api, items):
+        if self.show_footprints:
+            self.footprints.add_items(items)
+
     def on_back(self):
         self.windows['RESULTS']['data'] = None
         self.windows['RESULTS']['dialog'].close()
@@ -118,14 +122,57 @@ class STACBrowser:
 
     def downloading_finished(self):
         self.windows['DOWNLOADING']['dialog'].close()
-        self.current_window = 'COLLECTION_LOADING'
+        self.current_window = 'QUERY'
         self.reset_windows()
 
-    def collection_load_finished(self, apis):
-        self.windows['QUERY']['data'] = {'apis': apis}
-        self.current_window = 'QUERY'
-        self.windows['COLLECTION_LOADING']['dialog'].close()
-        self.load_window()
+    def refresh_catalogs(self):
+        if self.refresh_task is not None \
+                and not self.refresh_task.is_finished():
+            return
+
+        config = shared_config()
+        # Refetched into fresh objects; the open dialog keeps the cached
+        # ones until each API is swapped in on the GUI thread
+        expired = [
+            API({'id': api.id, 'href': api.href})
+            for api in config.apis
+            if api.expired(config.api_update_interval)
+        ]
+        if not expired:
+            return
+
+        self.refresh_task = LoadCollectionsTask(
+            expired,
+            on_api_loaded=self.on_catalog_refreshed,
+            on_error=self.on_catalog_refresh_error
+        )
+        self.refresh_task.start()
+
+    def on_catalog_refreshed(self, api):
+        config = shared_config()
+        apis = config.apis
+        ids = [a.id for a in apis]
+        if api.id not in ids:
+            # Removed while it was being refreshed
+            return
+
+        index = ids.index(api.id)
+        if apis[index].href != api.href:
+            # Edited while it was being refreshed; the edit wins
+            return
+
+        apis[index] = api
+        config.apis = apis
+
+        dialog = self.windows['QUERY']['dialog']
+        if dialog is not None:
+            dialog.update_api(api)
+
+    def on_catalog_refresh_error(self, e, api):
+        reason = getattr(e, 'reason', type(e).__name__)
+        warning(self.iface,
+                f'Failed to refresh {api.href}; {reason}; '
+                'using cached collections')
 
     def results_error(self):
         self.windows['ITEM_LOADING']['dialog'].close()
@@ -135,7 +182,11 @@ class STACBrowser:
         self.load_window()
 
     def item_load_finished(self, items):
-        self.windows['RESULTS']['data'] = {'items': items}
+        self.windows['RESULTS']['data'] = {
+            'items': items,
+            'extent': self.windows['ITEM_LOADING']['data']['extent'],
+            'footprints': self.footprints if self.show_footprints else None
+        }
         self.current_window = 'RESULTS'
         self.windows['ITEM_LOADING']['dialog'].close()
         self.windows['ITEM_LOADING']['data'] = None
@@ -184,13 +235,11 @@ class STACBrowser:
         correct_version = self.check_version()
         if not correct_version:
             return
-        if self.current_window == 'COLLECTION_LOADING':
-            config = Config()
-            if config.last_update is not None \
-                    and time.time() - config.last_update \
-                    < config.api_update_interval:
-                self.current_window = 'QUERY'
-                self.windows['QUERY']['data'] = {'apis': config.apis}
+        if self.current_window == 'QUERY' \
+                and self.windows['QUERY']['dialog'] is None:
+            # Serve the cached catalogs and revalidate in the background
+            self.windows['QUERY']['data'] = {'apis': shared_config().apis}
+            self.refresh_catalogs()
 
         window = self.windows.get(self.current_window, None)
 
@@ -217,7 +266,7 @@ class STACBrowser:
                 window['dialog'].close()
             window['data'] = None
             window['dialog'] = None
-        self.current_window = 'COLLECTION_LOADING'
+        self.current_window = 'QUERY'
 
     def check_version(self):
         if sys.version_info < (3, 6):
@@ -241,7 +290,7 @@ class STACBrowser:
         if not correct_version:
             return
         dialog = ConfigureAPIDialog(
-            data={'apis': Config().apis},
+            data={'apis': shared_config().apis},
             hooks={},
             parent=self.iface.mainWindow(),
             iface=self.iface
@@ -281,6 +330,9 @@ class STACBrowser:
             parent=self.iface.mainWindow())
 
     def unload(self):
+        if self.refresh_task is not None:
+            self.refresh_task.cancel()
+
         for action in self.actions:
             self.iface.removePluginWebMenu(u'&STAC Browser', action)
             self.iface.removeToolBarIcon(action)
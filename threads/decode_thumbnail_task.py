@@ -0,0 +1,36 @@
+from PyQt5.QtCore import Qt, pyqtSignal
+from PyQt5.QtGui import QImage
+from ..models.item import Item
+from .task import Task, HIGH_PRIORITY
+
+
+class DecodeThumbnailTask(Task):
+    finished_signal = pyqtSignal(Item, int, int, QImage)
+
+    def __init__(self, item, path, width, height, on_decoded=None):
+        Task.__init__(self, priority=HIGH_PRIORITY)
+        self.item = item
+        self.path = path
+        self.width = width
+        self.height = height
+        self.on_decoded = on_decoded
+
+        self.finished_signal.connect(self.on_decoded)
+
+    def run(self):
+        # QImage (unlike QPixmap) is safe to decode and scale off the GUI
+        # thread
+        image = QImage(self.path)
+        if not image.isNull():
+            image = image.scaled(
+                self.width,
+                self.height,
+                aspectRatioMode=Qt.KeepAspectRatio,
+                transformMode=Qt.SmoothTransformation
+            )
+
+        if self.cancelled:
+            self.cancelled_signal.emit()
+            return
+
+        self.finished_signal.emit(self.item, self.width, self.height, image)
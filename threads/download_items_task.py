@@ -0,0 +1,147 @@
+from PyQt5.QtCore import pyqtSignal
+from ..models.item import Item
+from ..utils import fs, network, asset_store
+from .task import Task, LOW_PRIORITY
+from ..utils.download_scheduler import (DownloadScheduler, DEFAULT_WORKERS,
+                                        DEFAULT_CONNECTIONS_PER_HOST)
+
+
+class DownloadItemsTask(Task):
+    progress_signal = pyqtSignal(int, int, str)
+    gdal_error_signal = pyqtSignal(Exception)
+    error_signal = pyqtSignal(Item, Exception)
+    add_layer_signal = pyqtSignal(int, int, Item, str)
+    finished_signal = pyqtSignal()
+
+    def __init__(self, downloads, download_directory, on_progress=None,
+                 on_error=None, on_gdal_error=None, on_add_layer=None,
+                 on_finished=None, on_cancelled=None,
+                 max_workers=DEFAULT_WORKERS,
+                 max_connections_per_host=DEFAULT_CONNECTIONS_PER_HOST,
+                 use_asset_store=True,
+                 asset_store_size=asset_store.DEFAULT_MAX_SIZE):
+        Task.__init__(self, priority=LOW_PRIORITY)
+
+        self.downloads = downloads
+        self.download_directory = download_directory
+        self.on_progress = on_progress
+        self.on_error = on_error
+        self.on_gdal_error = on_gdal_error
+        self.on_add_layer = on_add_layer
+        self.on_finished = on_finished
+        self.on_cancelled = on_cancelled
+        self.max_workers = max_workers
+        self.max_connections_per_host = max_connections_per_host
+        self.use_asset_store = use_asset_store
+        self.asset_store_size = asset_store_size
+
+        self._gdal_path = None
+        self._raster_filenames = {}
+        self._scheduler = None
+
+        self.progress_signal.connect(self.on_progress)
+        self.error_signal.connect(self.on_error)
+        self.gdal_error_signal.connect(self.on_gdal_error)
+        self.add_layer_signal.connect(self.on_add_layer)
+        self.finished_signal.connect(self.on_finished)
+        if self.on_cancelled is not None:
+            self.cancelled_signal.connect(self.on_cancelled)
+
+    def run(self):
+        self._gdal_path = fs.gdal_path()
+
+        store = None
+        if self.use_asset_store:
+            store = asset_store.shared()
+            store.max_size = self.asset_store_size
+
+        self._scheduler = DownloadScheduler(
+            max_workers=self.max_workers,
+            max_connections_per_host=self.max_connections_per_host,
+            on_progress=self.on_bytes_progress,
+            on_group_finished=self.on_item_finished,
+            store=store,
+            token=self.token
+        )
+
+        for i, download in enumerate(self.downloads):
+            item = download['item']
+            options = download['options']
+            try:
+                assets, raster_filenames = item.download_plan(
+                    options,
+                    self.download_directory
+                )
+            except OSError as e:
+                self.error_signal.emit(item, e)
+                continue
+
+            self._raster_filenames[i] = raster_filenames
+            self._scheduler.add_group(i)
+            for asset, filename in assets:
+                self._scheduler.add(
+                    asset.href,
+                    filename,
+                    size=asset.size,
+                    group=i,
+                    checksum=asset.checksum,
+                    segments=options.get('segments', 1),
+                    segment_threshold=options.get(
+                        'segment_threshold',
+                        network.SEGMENT_THRESHOLD
+                    )
+                )
+
+        self._scheduler.run()
+
+        if self.cancelled:
+            self.cancelled_signal.emit()
+            return
+
+        self.finished_signal.emit()
+
+    def on_bytes_progress(self, received, total, finished, count):
+        self.progress_signal.emit(
+            received // 1024,
+            total // 1024,
+            ' '.join((
+                f'[{finished}/{count}] Downloading',
+                f'{received / 1024 / 1024:.1f}',
+                f'of {total / 1024 / 1024:.1f} MB'
+            ))
+        )
+
+    def on_item_finished(self, i, errors):
+        item = self.downloads[i]['item']
+        options = self.downloads[i]['options']
+
+        if self.cancelled:
+            return
+
+        if errors:
+            self.error_signal.emit(item, errors[0])
+            return
+
+        if not options.get('add_to_layers', False):
+            return
+
+        if self._gdal_path is None:
+            self.gdal_error_signal.emit(FileNotFoundError('gdalbuildvrt'))
+            return
+
+        try:
+            item.build_vrt(
+                self._gdal_path,
+                self.download_directory,
+                self._raster_filenames[i]
+            )
+        except FileNotFoundError as e:
+            self.gdal_error_signal.emit(e)
+            return
+
+        self.add_layer_signal.emit(
+            self._scheduler.bytes_received // 1024,
+            self._scheduler.bytes_total // 1024,
+            item,
+            self.download_directory
+        )
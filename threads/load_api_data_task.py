@@ -1,15 +1,17 @@
 import socket
-from PyQt5.QtCore import QThread, pyqtSignal
+from PyQt5.QtCore import pyqtSignal
 from urllib.error import URLError
 from ..models.api import API
+from ..utils.cancellation import CancelledError
+from .task import Task, HIGH_PRIORITY
 
 
-class LoadAPIDataThread(QThread):
+class LoadAPIDataTask(Task):
     error_signal = pyqtSignal(Exception)
     finished_signal = pyqtSignal(API)
 
     def __init__(self, api, on_error=None, on_finished=None):
-        QThread.__init__(self)
+        Task.__init__(self, priority=HIGH_PRIORITY)
         self.api = api
 
         self.on_error = on_error
@@ -20,8 +22,10 @@ class LoadAPIDataThread(QThread):
 
     def run(self):
         try:
-            self.api.load()
+            self.api.load(token=self.token)
             self.finished_signal.emit(self.api)
+        except CancelledError:
+            self.cancelled_signal.emit()
         except URLError as e:
             self.error_signal.emit(e)
         except socket.timeout as e:
@@ -0,0 +1,68 @@
+import socket
+from concurrent.futures import as_completed
+from PyQt5.QtCore import pyqtSignal
+from urllib.error import URLError
+from ..models.api import API
+from ..utils import network
+from ..utils.cancellation import CancelledError
+from .task import Task, LOW_PRIORITY
+
+
+class LoadCollectionsTask(Task):
+    api_loaded_signal = pyqtSignal(API)
+    error_signal = pyqtSignal(Exception, API)
+    finished_signal = pyqtSignal(list)
+
+    def __init__(self, api_list, on_api_loaded=None, on_error=None,
+                 on_finished=None, on_cancelled=None):
+        Task.__init__(self, priority=LOW_PRIORITY)
+
+        self.api_list = api_list
+        self.on_api_loaded = on_api_loaded
+        self.on_error = on_error
+        self.on_finished = on_finished
+        self.on_cancelled = on_cancelled
+
+        # Each API is handed over as soon as it loads, not at the end
+        self.api_loaded_signal.connect(self.on_api_loaded)
+        self.error_signal.connect(self.on_error)
+        if self.on_finished is not None:
+            self.finished_signal.connect(self.on_finished)
+        if self.on_cancelled is not None:
+            self.cancelled_signal.connect(self.on_cancelled)
+
+    def run(self):
+        if len(self.api_list) == 0:
+            self.finished_signal.emit([])
+            return
+
+        loaded = {}
+
+        executor = network.executor()
+        futures = {
+            executor.submit(api.load, self.token): i
+            for i, api in enumerate(self.api_list)
+        }
+        for future in as_completed(futures):
+            i = futures[future]
+            api = self.api_list[i]
+            try:
+                future.result()
+                loaded[i] = api
+            except CancelledError:
+                continue
+            except URLError as e:
+                self.error_signal.emit(e, api)
+                continue
+            except socket.timeout as e:
+                self.error_signal.emit(e, api)
+                continue
+
+            if not self.cancelled:
+                self.api_loaded_signal.emit(api)
+
+        if self.cancelled:
+            self.cancelled_signal.emit()
+            return
+
+        self.finished_signal.emit([loaded[i] for i in sorted(loaded)])
@@ -0,0 +1,131 @@
+import socket
+import threading
+from concurrent.futures import as_completed
+from PyQt5.QtCore import pyqtSignal
+from urllib.error import URLError
+from ..models.api import API
+from ..models.item import Item
+from ..models.compact import compact
+from ..utils import network, search_cache
+from ..utils.cancellation import CancelledError
+from .task import Task
+
+
+class LoadItemsTask(Task):
+    progress_signal = pyqtSignal(API, list, int)
+    page_signal = pyqtSignal(API, list)
+    api_error_signal = pyqtSignal(API, Exception)
+    error_signal = pyqtSignal(Exception)
+    finished_signal = pyqtSignal(list)
+
+    def __init__(self, api_collections, extent, start_time, end_time,
+                 page_limit=10, item_limit=None, prefetch_depth=1,
+                 cache_ttl=search_cache.DEFAULT_TTL, drop_keys=(),
+                 on_progress=None, on_page=None, on_api_error=None,
+                 on_error=None, on_finished=None, on_cancelled=None):
+        Task.__init__(self)
+
+        self.api_collections = api_collections
+        self.extent = extent
+        self.start_time = start_time
+        self.end_time = end_time
+        self.page_limit = page_limit
+        self.item_limit = item_limit
+        self.prefetch_depth = prefetch_depth
+        self.cache_ttl = cache_ttl
+        self.drop_keys = drop_keys
+        self.on_progress = on_progress
+        self.on_page = on_page
+        self.on_api_error = on_api_error
+        self.on_error = on_error
+        self.on_finished = on_finished
+        self.on_cancelled = on_cancelled
+
+        self._items = []
+        self._items_lock = threading.Lock()
+
+        self.progress_signal.connect(self.on_progress)
+        if self.on_page is not None:
+            self.page_signal.connect(self.on_page)
+        if self.on_api_error is not None:
+            self.api_error_signal.connect(self.on_api_error)
+        self.error_signal.connect(self.on_error)
+        self.finished_signal.connect(self.on_finished)
+        if self.on_cancelled is not None:
+            self.cancelled_signal.connect(self.on_cancelled)
+
+    def run(self):
+        self._items = []
+        errors = []
+
+        executor = network.executor()
+        futures = {
+            executor.submit(self.search_api, api_collection):
+                api_collection['api']
+            for api_collection in self.api_collections
+        }
+        for future in as_completed(futures):
+            api = futures[future]
+            try:
+                future.result()
+            except CancelledError:
+                continue
+            except URLError as e:
+                errors.append(e)
+                self.api_error_signal.emit(api, e)
+            except socket.timeout as e:
+                errors.append(e)
+                self.api_error_signal.emit(api, e)
+
+        if self.cancelled:
+            self.cancelled_signal.emit()
+            return
+
+        if errors and len(errors) == len(self.api_collections):
+            self.error_signal.emit(errors[-1])
+            return
+
+        self.finished_signal.emit(self._items)
+
+    def search_api(self, api_collection):
+        api = api_collection['api']
+        collections = api_collection['collections']
+        current_page = 0
+
+        cache = search_cache.shared()
+        cache_key = cache.key(api, collections, self.extent, self.start_time,
+                              self.end_time, page_limit=self.page_limit,
+                              item_limit=self.item_limit,
+                              drop_keys=self.drop_keys)
+        features = cache.get(cache_key, ttl=self.cache_ttl)
+        if features is not None:
+            items = [Item(api, compact(f, self.drop_keys)) for f in features]
+            with self._items_lock:
+                self._items.extend(items)
+            self.page_signal.emit(api, items)
+            return
+
+        def on_next_page(api):
+            nonlocal current_page
+            current_page += 1
+            self.progress_signal.emit(api, collections, current_page)
+
+        pages = api.search_pages(collections,
+                                 self.extent,
+                                 self.start_time,
+                                 self.end_time,
+                                 on_next_page=on_next_page,
+                                 page_limit=self.page_limit,
+                                 item_limit=self.item_limit,
+                                 prefetch_depth=self.prefetch_depth,
+                                 drop_keys=self.drop_keys,
+                                 token=self.token)
+        features = []
+        for items in pages:
+            features.extend(item.json for item in items)
+            with self._items_lock:
+                self._items.extend(items)
+            self.page_signal.emit(api, items)
+
+        if self.cache_ttl:
+            cache.put(cache_key, features, ttl=self.cache_ttl)
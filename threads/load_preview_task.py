@@ -0,0 +1,28 @@
+from PyQt5.QtCore import pyqtSignal
+from ..utils import thumbnail_cache
+from ..utils.cancellation import CancelledError
+from ..models.item import Item
+from .task import Task, HIGH_PRIORITY
+
+
+class LoadPreviewTask(Task):
+    finished_signal = pyqtSignal(Item, bool)
+
+    def __init__(self, item, on_image_loaded=None, priority=HIGH_PRIORITY):
+        Task.__init__(self, priority=priority)
+        self.item = item
+        self.on_image_loaded = on_image_loaded
+
+        self.finished_signal.connect(self.on_image_loaded)
+
+    def run(self):
+        try:
+            thumbnail_cache.shared().fetch(self.item.thumbnail_url,
+                                           self.item.hashed_id,
+                                           token=self.token)
+            self.finished_signal.emit(self.item, False)
+        except CancelledError:
+            self.cancelled_signal.emit()
+        except OSError:
+            # URL errors, timeouts and local file errors alike
+            self.finished_signal.emit(self.item, True)
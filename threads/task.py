@@ -0,0 +1,116 @@
+import threading
+from PyQt5.QtCore import QObject, QRunnable, QThreadPool, pyqtSignal
+from ..utils.cancellation import CancellationToken
+
+
+MAX_THREADS = 8
+
+LOW_PRIORITY = 0
+NORMAL_PRIORITY = 5
+HIGH_PRIORITY = 10
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def executor():
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = TaskExecutor()
+        return _executor
+
+
+class Task(QObject):
+    cancelled_signal = pyqtSignal()
+
+    def __init__(self, priority=NORMAL_PRIORITY):
+        QObject.__init__(self)
+
+        self.priority = priority
+
+        self._token = CancellationToken()
+        self._done = threading.Event()
+
+    @property
+    def token(self):
+        return self._token
+
+    @property
+    def cancelled(self):
+        return self._token.cancelled
+
+    def start(self):
+        executor().submit(self)
+
+    def cancel(self):
+        self._token.cancel()
+        if executor().cancel(self):
+            # Never started, so run() won't get to report it
+            self.cancelled_signal.emit()
+
+    def is_finished(self):
+        return self._done.is_set()
+
+    def set_done(self):
+        self._done.set()
+
+    def wait(self, timeout=None):
+        return self._done.wait(timeout)
+
+    def run(self):
+        # Overridden by each task, runs on a TaskExecutor thread
+        pass
+
+
+class TaskRunnable(QRunnable):
+    def __init__(self, executor, task):
+        QRunnable.__init__(self)
+        self.setAutoDelete(False)
+
+        self.task = task
+        self._executor = executor
+
+    def run(self):
+        try:
+            if self.task.cancelled:
+                self.task.cancelled_signal.emit()
+            else:
+                self.task.run()
+        finally:
+            self._executor.task_done(self.task)
+
+
+class TaskExecutor:
+    def __init__(self, max_threads=MAX_THREADS):
+        self._pool = QThreadPool()
+        self._pool.setMaxThreadCount(max_threads)
+
+        # Runnables (and their tasks) stay referenced until they finish
+        self._runnables = {}
+        self._lock = threading.Lock()
+
+    def submit(self, task):
+        runnable = TaskRunnable(self, task)
+        with self._lock:
+            self._runnables[id(task)] = runnable
+        self._pool.start(runnable, task.priority)
+        return task
+
+    def cancel(self, task):
+        with self._lock:
+            runnable = self._runnables.get(id(task), None)
+
+        if runnable is None or not self._pool.tryTake(runnable):
+            return False
+
+        self.task_done(task)
+        return True
+
+    def task_done(self, task):
+        with self._lock:
+            self._runnables.pop(id(task), None)
+        task.set_done()
+
+    def wait_for_done(self, timeout=-1):
+        return self._pool.waitForDone(timeout)
@@ -0,0 +1,64 @@
+from collections import deque
+from ..utils import thumbnail_cache
+from .load_preview_task import LoadPreviewTask
+from .task import LOW_PRIORITY
+
+
+PREFETCH_CONCURRENCY = 4
+
+
+class ThumbnailPrefetcher:
+    def __init__(self, max_in_flight=PREFETCH_CONCURRENCY,
+                 on_image_loaded=None):
+        self.max_in_flight = max_in_flight
+        self.on_image_loaded = on_image_loaded
+
+        self._queue = deque()
+        self._tasks = {}
+
+    def prefetch(self, items):
+        cache = thumbnail_cache.shared()
+
+        # Newer requests replace whatever was still waiting
+        self._queue.clear()
+        for item in items:
+            if item.thumbnail_url is None or id(item) in self._tasks:
+                continue
+            if cache.contains(item.hashed_id):
+                continue
+            self._queue.append(item)
+
+        self._start_next()
+
+    def loading(self, item):
+        return id(item) in self._tasks
+
+    def cancel(self):
+        self._queue.clear()
+        for task in list(self._tasks.values()):
+            task.cancel()
+        self._tasks = {}
+
+    def _start_next(self):
+        while self._queue and len(self._tasks) < self.max_in_flight:
+            item = self._queue.popleft()
+            if id(item) in self._tasks:
+                continue
+
+            task = LoadPreviewTask(item, on_image_loaded=self.on_loaded,
+                                   priority=LOW_PRIORITY)
+            task.cancelled_signal.connect(
+                lambda item=item: self.on_cancelled(item)
+            )
+            self._tasks[id(item)] = task
+            task.start()
+
+    def on_loaded(self, item, error):
+        self._tasks.pop(id(item), None)
+        if self.on_image_loaded is not None:
+            self.on_image_loaded(item, error)
+        self._start_next()
+
+    def on_cancelled(self, item):
+        self._tasks.pop(id(item), None)
+        self._start_next()
@@ -0,0 +1,168 @@
+import os
+import json
+import shutil
+import hashlib
+import threading
+from urllib.error import URLError
+
+from . import network
+from .cancellation import check
+from .disk_lru import DiskLRU
+
+
+DEFAULT_MAX_SIZE = 10 * 1024 * 1024 * 1024
+FICLONE = 0x40049409
+
+_shared = None
+_shared_lock = threading.Lock()
+
+
+def default_directory():
+    base = os.environ.get('XDG_CACHE_HOME', None) \
+        or os.environ.get('LOCALAPPDATA', None) \
+        or os.path.join(os.path.expanduser('~'), '.cache')
+    return os.path.join(base, 'qgis-stac-browser', 'assets')
+
+
+def shared():
+    global _shared
+    with _shared_lock:
+        if _shared is None:
+            _shared = AssetStore()
+        return _shared
+
+
+def reflink(source, destination):
+    try:
+        import fcntl
+    except ImportError:
+        return False
+
+    try:
+        with open(source, 'rb') as src, open(destination, 'wb') as dst:
+            fcntl.ioctl(dst.fileno(), FICLONE, src.fileno())
+    except OSError:
+        try:
+            os.remove(destination)
+        except OSError:
+            pass
+        return False
+
+    return True
+
+
+def place(source, destination):
+    # Copy-on-write clone, else a plain copy. Never a hardlink: an in-place
+    # edit of one project's raster would change the store and every other
+    # project's copy with it
+    temp_path = f'{destination}.{threading.get_ident()}.tmp'
+    if not reflink(source, temp_path):
+        shutil.copyfile(source, temp_path)
+    os.replace(temp_path, destination)
+
+
+class AssetStore(DiskLRU):
+    def __init__(self, directory=None, max_size=DEFAULT_MAX_SIZE):
+        if directory is None:
+            directory = default_directory()
+
+        super(AssetStore, self).__init__(directory, max_size)
+
+    def key(self, url, checksum=None, validator=None):
+        if checksum is not None:
+            return f'checksum-{checksum.lower()}'
+
+        if validator is None:
+            return None
+
+        value = f'{url}\n{validator}'.encode('utf-8')
+        return f'href-{hashlib.sha256(value).hexdigest()}'
+
+    def resolve_key(self, url, checksum=None, probe=None):
+        if checksum is not None:
+            return self.key(url, checksum=checksum)
+
+        if probe is None:
+            return None
+
+        validator = probe['etag'] or probe['last_modified']
+        return self.key(url, validator=validator)
+
+    def body_path(self, key):
+        return os.path.join(self.directory, key)
+
+    def meta_path(self, key):
+        return f'{self.body_path(key)}.json'
+
+    def lookup(self, key):
+        try:
+            with open(self.meta_path(key), 'r') as f:
+                meta = json.load(f)
+            stat = os.stat(self.body_path(key))
+        except (OSError, ValueError):
+            return None
+
+        if stat.st_size != meta.get('size', None):
+            # Truncated or replaced behind our back; don't trust it
+            self.remove(key)
+            return None
+
+        return meta
+
+    def link(self, key, destination):
+        if self.lookup(key) is None:
+            return False
+
+        path = self.body_path(key)
+        try:
+            place(path, destination)
+            os.utime(path)
+        except OSError:
+            return False
+
+        return True
+
+    def add(self, key, source, url):
+        size = os.path.getsize(source)
+        if size > self.max_size:
+            return
+
+        meta = {'url': url, 'size': size}
+
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            previous = self.lookup(key)
+            place(source, self.body_path(key))
+        except OSError:
+            return
+
+        with self._lock:
+            self._write(self.meta_path(key), json.dumps(meta).encode('utf-8'))
+
+            previous_size = 0 if previous is None else previous.get('size', 0)
+            self._track(size, previous_size)
+
+    def download(self, url, path, on_progress=None, checksum=None,
+                 token=None, **kwargs):
+        probe = None
+        if checksum is None:
+            # Shared with network.download, which needs it for byte ranges
+            try:
+                probe = network.probe(url, token=token)
+            except (URLError, OSError):
+                check(token)
+
+        key = self.resolve_key(url, checksum=checksum, probe=probe)
+
+        if key is not None and self.link(key, path):
+            if on_progress is not None:
+                size = os.path.getsize(path)
+                on_progress(size, size)
+            return
+
+        network.download(url, path, on_progress=on_progress,
+                         checksum=checksum, probe=probe, token=token,
+                         **kwargs)
+
+        if key is not None:
+            self.add(key, path, url)
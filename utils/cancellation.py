@@ -0,0 +1,60 @@
+import threading
+
+
+class CancelledError(Exception):
+    pass
+
+
+class CancellationToken:
+    def __init__(self):
+        self._event = threading.Event()
+        self._lock = threading.Lock()
+        self._callbacks = {}
+        self._next_handle = 0
+
+    @property
+    def cancelled(self):
+        return self._event.is_set()
+
+    def cancel(self):
+        with self._lock:
+            if self._event.is_set():
+                return
+            self._event.set()
+            callbacks, self._callbacks = self._callbacks, {}
+
+        for callback in callbacks.values():
+            try:
+                callback()
+            except Exception:
+                pass
+
+    def raise_if_cancelled(self):
+        if self.cancelled:
+            raise CancelledError()
+
+    def register(self, callback):
+        with self._lock:
+            if not self._event.is_set():
+                handle = self._next_handle
+                self._next_handle += 1
+                self._callbacks[handle] = callback
+                return handle
+
+        callback()
+        return None
+
+    def unregister(self, handle):
+        if handle is None:
+            return
+
+        with self._lock:
+            self._callbacks.pop(handle, None)
+
+    def wait(self, timeout=None):
+        return self._event.wait(timeout)
+
+
+def check(token):
+    if token is not None:
+        token.raise_if_cancelled()
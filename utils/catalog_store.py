@@ -0,0 +1,263 @@
+import os
+import json
+import sqlite3
+import hashlib
+import threading
+
+
+SCHEMA = '''
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+
+CREATE TABLE IF NOT EXISTS apis (
+    id TEXT PRIMARY KEY,
+    href TEXT NOT NULL,
+    position REAL NOT NULL,
+    data TEXT,
+    hash TEXT NOT NULL,
+    updated REAL
+);
+
+CREATE TABLE IF NOT EXISTS collections (
+    api_id TEXT NOT NULL REFERENCES apis (id) ON DELETE CASCADE,
+    id TEXT NOT NULL,
+    position REAL NOT NULL,
+    title TEXT,
+    json TEXT NOT NULL,
+    hash TEXT NOT NULL,
+    PRIMARY KEY (api_id, id)
+);
+
+CREATE INDEX IF NOT EXISTS collections_position
+    ON collections (api_id, position);
+'''
+
+SCHEMA_VERSION = 1
+
+
+def digest(value):
+    return hashlib.sha1(
+        json.dumps(value, sort_keys=True).encode('utf-8')
+    ).hexdigest()
+
+
+def positions(ids, existing):
+    # Rows keep their position while their relative order is unchanged, so
+    # an insert or removal does not rewrite every row after it
+    kept = [existing[i] for i in ids if i in existing]
+    if any(a >= b for a, b in zip(kept, kept[1:])):
+        return {i: float(n) for n, i in enumerate(ids)}
+
+    result = {}
+    pending = []
+    lower = None
+    for i in list(ids) + [None]:
+        if i is not None and i not in existing:
+            pending.append(i)
+            continue
+
+        upper = None if i is None else existing[i]
+        count = len(pending) + 1
+        for n, new_id in enumerate(pending, 1):
+            if lower is None and upper is None:
+                result[new_id] = float(n)
+            elif upper is None:
+                result[new_id] = lower + n
+            elif lower is None:
+                result[new_id] = upper - count + n
+            else:
+                result[new_id] = lower + (upper - lower) * n / count
+        pending = []
+
+        if i is not None:
+            result[i] = upper
+            lower = upper
+
+    ordered = [result[i] for i in ids]
+    if any(a >= b for a, b in zip(ordered, ordered[1:])):
+        # Ran out of float precision between two neighbours
+        return {i: float(n) for n, i in enumerate(ids)}
+
+    return result
+
+
+class CatalogStore:
+    def __init__(self, path):
+        self.path = path
+
+        self._lock = threading.Lock()
+        # Collections load lazily from whichever thread touches them first
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        self._connection.execute('PRAGMA foreign_keys = ON')
+        self._connection.executescript(SCHEMA)
+        self._connection.execute(f'PRAGMA user_version = {SCHEMA_VERSION}')
+
+    @property
+    def initialized(self):
+        with self._lock:
+            row = self._connection.execute(
+                'SELECT value FROM meta WHERE key = ?', ('initialized',)
+            ).fetchone()
+        return row is not None
+
+    def modified_time(self):
+        try:
+            return os.stat(self.path).st_mtime_ns
+        except OSError:
+            return None
+
+    def apis(self):
+        with self._lock:
+            rows = self._connection.execute(
+                'SELECT id, href, data, updated FROM apis ORDER BY position'
+            ).fetchall()
+
+        return [
+            {
+                'id': api_id,
+                'href': href,
+                'data': None if data is None else json.loads(data),
+                'updated': updated,
+            }
+            for api_id, href, data, updated in rows
+        ]
+
+    def collections(self, api_id):
+        with self._lock:
+            rows = self._connection.execute(
+                'SELECT json FROM collections WHERE api_id = ? '
+                'ORDER BY position', (api_id,)
+            ).fetchall()
+
+        return [json.loads(row[0]) for row in rows]
+
+    def save_apis(self, apis):
+        with self._lock, self._connection:
+            existing = {
+                api_id: (api_hash, position, updated)
+                for api_id, api_hash, position, updated
+                in self._connection.execute(
+                    'SELECT id, hash, position, updated FROM apis'
+                )
+            }
+
+            apis = self._unique(apis)
+            api_positions = positions(
+                [api.id for api in apis],
+                {api_id: row[1] for api_id, row in existing.items()}
+            )
+
+            saved = set()
+            for api in apis:
+                saved.add(api.id)
+                self._save_api(api, api_positions[api.id],
+                               existing.get(api.id, None))
+
+            for api_id in set(existing) - saved:
+                self._connection.execute(
+                    'DELETE FROM apis WHERE id = ?', (api_id,)
+                )
+
+            self._connection.execute(
+                'INSERT OR IGNORE INTO meta (key, value) VALUES (?, ?)',
+                ('initialized', '1')
+            )
+
+    def _save_api(self, api, position, row):
+        data = api.data or None
+        api_hash = digest([api.href, data])
+
+        if row is None:
+            self._connection.execute(
+                'INSERT INTO apis (id, href, position, data, hash, updated) '
+                'VALUES (?, ?, ?, ?, ?, ?)',
+                (api.id, api.href, position, self._dumps(data), api_hash,
+                 api.updated)
+            )
+        elif row[0] != api_hash:
+            self._connection.execute(
+                'UPDATE apis SET href = ?, position = ?, data = ?, hash = ?, '
+                'updated = ? WHERE id = ?',
+                (api.href, position, self._dumps(data), api_hash,
+                 api.updated, api.id)
+            )
+        elif row[1:] != (position, api.updated):
+            self._connection.execute(
+                'UPDATE apis SET position = ?, updated = ? WHERE id = ?',
+                (position, api.updated, api.id)
+            )
+
+        # Collections that were never read back are unchanged by definition
+        if api.collections_loaded:
+            self._save_collections(api.id, api.collections)
+
+    def _save_collections(self, api_id, collections):
+        existing = {
+            collection_id: (collection_hash, position)
+            for collection_id, collection_hash, position
+            in self._connection.execute(
+                'SELECT id, hash, position FROM collections '
+                'WHERE api_id = ?', (api_id,)
+            )
+        }
+
+        collections = self._unique(collections)
+        collection_positions = positions(
+            [c.id or '' for c in collections],
+            {collection_id: row[1] for collection_id, row in existing.items()}
+        )
+
+        saved = set()
+        for collection in collections:
+            collection_id = collection.id or ''
+            position = collection_positions[collection_id]
+            saved.add(collection_id)
+
+            collection_hash = digest(collection.json)
+            row = existing.get(collection_id, None)
+
+            if row is None:
+                self._connection.execute(
+                    'INSERT INTO collections '
+                    '(api_id, id, position, title, json, hash) '
+                    'VALUES (?, ?, ?, ?, ?, ?)',
+                    (api_id, collection_id, position, collection.title,
+                     self._dumps(collection.json), collection_hash)
+                )
+            elif row[0] != collection_hash:
+                self._connection.execute(
+                    'UPDATE collections SET position = ?, title = ?, '
+                    'json = ?, hash = ? WHERE api_id = ? AND id = ?',
+                    (position, collection.title,
+                     self._dumps(collection.json), collection_hash,
+                     api_id, collection_id)
+                )
+            elif row[1] != position:
+                self._connection.execute(
+                    'UPDATE collections SET position = ? '
+                    'WHERE api_id = ? AND id = ?',
+                    (position, api_id, collection_id)
+                )
+
+        for collection_id in set(existing) - saved:
+            self._connection.execute(
+                'DELETE FROM collections WHERE api_id = ? AND id = ?',
+                (api_id, collection_id)
+            )
+
+    def _unique(self, values):
+        seen = set()
+        unique = []
+        for value in values:
+            key = value.id or ''
+            if key not in seen:
+                seen.add(key)
+                unique.append(value)
+        return unique
+
+    def _dumps(self, value):
+        if value is None:
+            return None
+        return json.dumps(value)
@@ -1,30 +1,92 @@
 import os
 import json
+import threading
 from ..models.api import API
+from .catalog_store import CatalogStore
+
+
+_shared = None
+_shared_lock = threading.Lock()
+
+
+def shared_config():
+    global _shared
+    with _shared_lock:
+        if _shared is None:
+            _shared = Config()
+        else:
+            # Another QGIS instance may have saved in the meantime
+            _shared.reload_if_changed()
+        return _shared
 
 
 class Config:
     def __init__(self):
         self._json = None
+        self._apis = None
+        self._mtime = None
+        self._store = CatalogStore(self.catalog_path)
         self.load()
 
     def load(self):
+        self._apis = None
         if not os.path.exists(self.path):
             self._json = {}
             self.save()
         else:
             with open(self.path, 'r') as f:
                 self._json = json.load(f)
+            self._mtime = self.modified_time()
+
+        if 'apis' in self._json:
+            self.migrate_apis()
+
+    def migrate_apis(self):
+        # Older versions embedded every catalog document in config.json
+        if not self._store.initialized:
+            self._store.save_apis([API(api) for api in self._json['apis']])
+        del self._json['apis']
+        self.save()
+
+    def modified_time(self):
+        try:
+            config_mtime = os.stat(self.path).st_mtime_ns
+        except OSError:
+            config_mtime = None
+        return (config_mtime, self._store.modified_time())
+
+    def reload_if_changed(self):
+        if self.modified_time() != self._mtime:
+            self.load()
 
     def save(self):
+        if self._apis is not None:
+            self._store.save_apis(self._apis)
+
         config = {
-            'apis': [api.json for api in self.apis],
             'download_directory': self.download_directory,
-            'last_update': self.last_update,
-            'api_update_interval': self.api_update_interval
+            'api_update_interval': self.api_update_interval,
+            'search_page_limit': self.search_page_limit,
+            'search_item_limit': self.search_item_limit,
+            'search_prefetch_depth': self.search_prefetch_depth,
+            'search_cache_ttl': self.search_cache_ttl,
+            'drop_item_links': self.drop_item_links,
+            'show_footprints': self.show_footprints,
+            'download_workers': self.download_workers,
+            'download_connections_per_host':
+                self.download_connections_per_host,
+            'download_segments': self.download_segments,
+            'download_segment_threshold': self.download_segment_threshold,
+            'use_asset_store': self.use_asset_store,
+            'asset_store_size': self.asset_store_size,
+            'thumbnail_cache_size': self.thumbnail_cache_size
         }
-        with open(self.path, 'w') as f:
+        temp_path = f'{self.path}.{os.getpid()}.tmp'
+        with open(temp_path, 'w') as f:
             f.write(json.dumps(config))
+        os.replace(temp_path, self.path)
+
+        self._mtime = self.modified_time()
 
     @property
     def path(self):
@@ -33,44 +95,52 @@ class Config:
             'config.json'
         )
 
+    @property
+    def catalog_path(self):
+        return os.path.join(
+            os.path.split(os.path.dirname(__file__))[0],
+            'catalog.sqlite'
+        )
+
     @property
     def apis(self):
-        apis = self._json.get('apis', None)
-
-        if apis is None:
-            apis = [
-                {
-                    "id": "default-staccato",
-                    "href": "https://stac.boundlessgeo.io",
-                },
-                {
-                    "id": "default-sat-api",
-                    "href": "https://sat-api.developmentseed.org",
-                },
-                {
-                    "id": "default-astraea",
-                    "href": "https://stac.astraea.earth/api/v2",
-                }
+        if self._apis is not None:
+            return list(self._apis)
+
+        if self._store.initialized:
+            self._apis = [
+                API(api, collection_loader=self._store.collections)
+                for api in self._store.apis()
             ]
+            return list(self._apis)
 
-        return [API(api) for api in apis]
+        apis = [
+            {
+                "id": "default-staccato",
+                "href": "https://stac.boundlessgeo.io",
+            },
+            {
+                "id": "default-sat-api",
+                "href": "https://sat-api.developmentseed.org",
+            },
+            {
+                "id": "default-astraea",
+                "href": "https://stac.astraea.earth/api/v2",
+            }
+        ]
+
+        self._apis = [API(api) for api in apis]
+        return list(self._apis)
 
     @apis.setter
     def apis(self, apis):
-        self._json['apis'] = [api.json for api in apis]
-
-    @property
-    def last_update(self):
-        return self._json.get('last_update', None)
+        self._apis = list(apis)
+        self.save()
 
     @property
     def api_update_interval(self):
         return self._json.get('api_update_interval', 60 * 60 * 24)
 
-    @last_update.setter
-    def last_update(self, value):
-        self._json['last_update'] = value
-
     @property
     def download_directory(self):
         if self._json.get('download_directory', None) is None:
@@ -80,3 +150,107 @@ class Config:
     @download_directory.setter
     def download_directory(self, value):
         self._json['download_directory'] = value
+
+    @property
+    def search_page_limit(self):
+        return self._json.get('search_page_limit', 10)
+
+    @search_page_limit.setter
+    def search_page_limit(self, value):
+        self._json['search_page_limit'] = value
+
+    @property
+    def search_item_limit(self):
+        return self._json.get('search_item_limit', None)
+
+    @search_item_limit.setter
+    def search_item_limit(self, value):
+        self._json['search_item_limit'] = value
+
+    @property
+    def search_prefetch_depth(self):
+        return self._json.get('search_prefetch_depth', 1)
+
+    @search_prefetch_depth.setter
+    def search_prefetch_depth(self, value):
+        self._json['search_prefetch_depth'] = value
+
+    @property
+    def search_cache_ttl(self):
+        return self._json.get('search_cache_ttl', 60 * 10)
+
+    @search_cache_ttl.setter
+    def search_cache_ttl(self, value):
+        self._json['search_cache_ttl'] = value
+
+    @property
+    def drop_item_links(self):
+        return self._json.get('drop_item_links', False)
+
+    @drop_item_links.setter
+    def drop_item_links(self, value):
+        self._json['drop_item_links'] = value
+
+    @property
+    def show_footprints(self):
+        return self._json.get('show_footprints', False)
+
+    @show_footprints.setter
+    def show_footprints(self, value):
+        self._json['show_footprints'] = value
+
+    @property
+    def download_workers(self):
+        return self._json.get('download_workers', 4)
+
+    @download_workers.setter
+    def download_workers(self, value):
+        self._json['download_workers'] = value
+
+    @property
+    def download_connections_per_host(self):
+        return self._json.get('download_connections_per_host', 2)
+
+    @download_connections_per_host.setter
+    def download_connections_per_host(self, value):
+        self._json['download_connections_per_host'] = value
+
+    @property
+    def download_segments(self):
+        return self._json.get('download_segments', 4)
+
+    @download_segments.setter
+    def download_segments(self, value):
+        self._json['download_segments'] = value
+
+    @property
+    def download_segment_threshold(self):
+        return self._json.get('download_segment_threshold', 64)
+
+    @download_segment_threshold.setter
+    def download_segment_threshold(self, value):
+        self._json['download_segment_threshold'] = value
+
+    @property
+    def use_asset_store(self):
+        return self._json.get('use_asset_store', True)
+
+    @use_asset_store.setter
+    def use_asset_store(self, value):
+        self._json['use_asset_store'] = value
+
+    @property
+    def asset_store_size(self):
+        return self._json.get('asset_store_size', 10 * 1024)
+
+    @asset_store_size.setter
+    def asset_store_size(self, value):
+        self._json['asset_store_size'] = value
+
+    @property
+    def thumbnail_cache_size(self):
+        return self._json.get('thumbnail_cache_size', 256)
+
+    @thumbnail_cache_size.setter
+    def thumbnail_cache_size(self, value):
+        self._json['thumbnail_cache_size'] = value
@@ -0,0 +1,75 @@
+import os
+import threading
+
+
+class DiskLRU:
+    def __init__(self, directory, max_size):
+        self.directory = directory
+        self.max_size = max_size
+
+        self._lock = threading.Lock()
+        self._size = None
+
+    def remove(self, filename):
+        path = os.path.join(self.directory, filename)
+        self._remove(f'{path}.json')
+        self._remove(path)
+
+    def clear(self):
+        with self._lock:
+            for filename in self._filenames():
+                self._remove(os.path.join(self.directory, filename))
+            self._size = 0
+
+    def _track(self, size, previous_size=0):
+        # Called with _lock held once an entry has been written
+        if self._size is not None:
+            self._size += size - previous_size
+        self._evict()
+
+    def _write(self, path, data):
+        temp_path = f'{path}.{threading.get_ident()}.tmp'
+        with open(temp_path, 'wb') as f:
+            f.write(data)
+        os.replace(temp_path, path)
+
+    def _remove(self, path):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+    def _filenames(self):
+        try:
+            return os.listdir(self.directory)
+        except OSError:
+            return []
+
+    def _entries(self):
+        entries = []
+        for filename in self._filenames():
+            if '.' in filename:
+                continue
+
+            try:
+                stat = os.stat(os.path.join(self.directory, filename))
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, filename))
+
+        return entries
+
+    def _evict(self):
+        if self._size is not None and self._size <= self.max_size:
+            return
+
+        entries = self._entries()
+        self._size = sum(size for _, size, _ in entries)
+        if self._size <= self.max_size:
+            return
+
+        for _, size, filename in sorted(entries):
+            self.remove(filename)
+            self._size -= size
+            if self._size <= self.max_size:
+                break
@@ -0,0 +1,209 @@
+import time
+import threading
+from urllib.parse import urlsplit
+
+from . import network
+
+
+DEFAULT_WORKERS = 4
+DEFAULT_CONNECTIONS_PER_HOST = 2
+PROGRESS_INTERVAL = 0.1
+
+
+class DownloadTask:
+    def __init__(self, url, path, size=None, group=None, checksum=None,
+                 segments=1, segment_threshold=network.SEGMENT_THRESHOLD):
+        self.url = url
+        self.path = path
+        self.size = size
+        self.group = group
+        self.checksum = checksum
+        self.segments = segments
+        self.segment_threshold = segment_threshold
+
+        self.connections = 1
+        self.received = 0
+        self.error = None
+
+    @property
+    def host(self):
+        return urlsplit(self.url).netloc
+
+    @property
+    def priority(self):
+        # Smallest known sizes first, unknown sizes last
+        return (self.size is None, self.size or 0)
+
+
+class DownloadScheduler:
+    def __init__(self, max_workers=DEFAULT_WORKERS,
+                 max_connections_per_host=DEFAULT_CONNECTIONS_PER_HOST,
+                 on_progress=None, on_group_finished=None, store=None,
+                 token=None):
+        self.max_workers = max_workers
+        # Counts connections, not files; a segmented file holds several
+        self.max_connections_per_host = max(1, min(
+            max_connections_per_host, network.MAX_CONNECTIONS_PER_HOST
+        ))
+        self.on_progress = on_progress
+        self.on_group_finished = on_group_finished
+        self.store = store
+        self.token = token
+
+        self.bytes_received = 0
+        self.bytes_total = 0
+        self.tasks_finished = 0
+
+        self._tasks = []
+        self._pending = []
+        self._groups = {}
+        self._active_hosts = {}
+        self._condition = threading.Condition()
+        self._last_progress = 0
+
+    def add_group(self, group):
+        self._groups.setdefault(group, {'remaining': 0, 'errors': []})
+
+    def add(self, url, path, size=None, group=None, checksum=None,
+            segments=1, segment_threshold=network.SEGMENT_THRESHOLD):
+        task = DownloadTask(url, path, size=size, group=group,
+                            checksum=checksum, segments=segments,
+                            segment_threshold=segment_threshold)
+        task.connections = self._connections(task)
+        self._tasks.append(task)
+
+        self.add_group(group)
+        self._groups[group]['remaining'] += 1
+        if size is not None:
+            self.bytes_total += size
+
+        return task
+
+    @property
+    def tasks(self):
+        return self._tasks
+
+    def _connections(self, task):
+        if task.segments <= 1 or (task.size is not None
+                                  and task.size < task.segment_threshold):
+            return 1
+        return min(task.segments, self.max_connections_per_host)
+
+    def run(self):
+        self._pending = sorted(self._tasks, key=lambda t: t.priority)
+
+        handle = None
+        if self.token is not None:
+            handle = self.token.register(self._on_cancelled)
+
+        for group, state in list(self._groups.items()):
+            if state['remaining'] == 0:
+                self._group_finished(group, [])
+
+        workers = [
+            threading.Thread(target=self._work)
+            for _ in range(min(self.max_workers, len(self._pending)))
+        ]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+
+        if self.token is not None:
+            self.token.unregister(handle)
+
+        self._emit_progress(force=True)
+
+        return [t for t in self._tasks if t.error is not None]
+
+    def _on_cancelled(self):
+        with self._condition:
+            self._pending = []
+            self._condition.notify_all()
+
+    def _next_task(self):
+        with self._condition:
+            while self._pending:
+                for i, task in enumerate(self._pending):
+                    active = self._active_hosts.get(task.host, 0)
+                    if active + task.connections \
+                            <= self.max_connections_per_host:
+                        self._active_hosts[task.host] = \
+                            active + task.connections
+                        return self._pending.pop(i)
+                self._condition.wait()
+
+        return None
+
+    def _work(self):
+        while True:
+            task = self._next_task()
+            if task is None:
+                return
+
+            fetch = network.download
+            if self.store is not None:
+                fetch = self.store.download
+
+            try:
+                fetch(
+                    task.url,
+                    task.path,
+                    checksum=task.checksum,
+                    size=task.size,
+                    segments=task.connections,
+                    segment_threshold=task.segment_threshold,
+                    token=self.token,
+                    on_progress=lambda received, total, task=task:
+                        self._on_task_progress(task, received, total)
+                )
+            except Exception as e:
+                task.error = e
+            finally:
+                with self._condition:
+                    self._active_hosts[task.host] -= task.connections
+                    self._condition.notify_all()
+
+            self._task_finished(task)
+
+    def _on_task_progress(self, task, received, total):
+        with self._condition:
+            if task.size is None and total is not None:
+                task.size = total
+                self.bytes_total += total
+
+            self.bytes_received += received - task.received
+            task.received = received
+
+        self._emit_progress()
+
+    def _task_finished(self, task):
+        with self._condition:
+            self.tasks_finished += 1
+            state = self._groups[task.group]
+            state['remaining'] -= 1
+            if task.error is not None:
+                state['errors'].append(task.error)
+            finished = state['remaining'] == 0
+
+        self._emit_progress(force=True)
+        if finished:
+            self._group_finished(task.group, state['errors'])
+
+    def _group_finished(self, group, errors):
+        if self.on_group_finished is not None:
+            self.on_group_finished(group, errors)
+
+    def _emit_progress(self, force=False):
+        if self.on_progress is None:
+            return
+
+        now = time.time()
+        with self._condition:
+            if not force and now - self._last_progress < PROGRESS_INTERVAL:
+                return
+            self._last_progress = now
+            progress = (self.bytes_received, self.bytes_total,
+                        self.tasks_finished, len(self._tasks))
+
+        self.on_progress(*progress)
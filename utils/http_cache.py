@@ -0,0 +1,97 @@
+import os
+import json
+import hashlib
+import tempfile
+
+from .disk_lru import DiskLRU
+
+
+DEFAULT_MAX_SIZE = 64 * 1024 * 1024
+
+
+def default_directory():
+    return os.path.join(
+        tempfile.gettempdir(),
+        'qgis-stac-browser',
+        'http-cache'
+    )
+
+
+class HTTPCache(DiskLRU):
+    def __init__(self, directory=None, max_size=DEFAULT_MAX_SIZE):
+        if directory is None:
+            directory = default_directory()
+
+        super(HTTPCache, self).__init__(directory, max_size)
+
+    def key(self, url):
+        return hashlib.sha256(url.encode('utf-8')).hexdigest()
+
+    def body_path(self, url):
+        return os.path.join(self.directory, self.key(url))
+
+    def meta_path(self, url):
+        return f'{self.body_path(url)}.json'
+
+    def lookup(self, url):
+        try:
+            with open(self.meta_path(url), 'r') as f:
+                meta = json.load(f)
+        except (OSError, ValueError):
+            return None
+
+        if meta.get('url', None) != url:
+            return None
+
+        return meta
+
+    def validators(self, meta):
+        headers = {}
+        if meta is None:
+            return headers
+
+        if meta.get('etag', None) is not None:
+            headers['If-None-Match'] = meta['etag']
+        if meta.get('last_modified', None) is not None:
+            headers['If-Modified-Since'] = meta['last_modified']
+
+        return headers
+
+    def read(self, url):
+        path = self.body_path(url)
+        try:
+            with open(path, 'rb') as f:
+                body = f.read()
+            os.utime(path)
+        except OSError:
+            return None
+
+        return body
+
+    def store(self, url, headers, body):
+        cache_control = headers.get('Cache-Control', '') or ''
+        if 'no-store' in cache_control.lower():
+            return
+
+        meta = {
+            'url': url,
+            'etag': headers.get('ETag', None),
+            'last_modified': headers.get('Last-Modified', None),
+            'size': len(body),
+        }
+        if meta['etag'] is None and meta['last_modified'] is None:
+            return
+
+        if len(body) > self.max_size:
+            return
+
+        with self._lock:
+            if not os.path.exists(self.directory):
+                os.makedirs(self.directory, exist_ok=True)
+
+            previous = self.lookup(url)
+            self._write(self.body_path(url), body)
+            self._write(self.meta_path(url), json.dumps(meta).encode('utf-8'))
+
+            previous_size = 0 if previous is None else previous.get('size', 0)
+            self._track(len(body), previous_size)
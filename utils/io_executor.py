@@ -0,0 +1,93 @@
+import threading
+from concurrent.futures import Future
+
+
+class _Job:
+    __slots__ = ('future', 'host', 'fn', 'args')
+
+    def __init__(self, future, host, fn, args):
+        self.future = future
+        self.host = host
+        self.fn = fn
+        self.args = args
+
+
+class IOExecutor:
+    def __init__(self, max_workers, max_per_host):
+        self.max_workers = max_workers
+        self.max_per_host = max_per_host
+
+        self._condition = threading.Condition()
+        self._queue = []
+        self._running = {}
+        self._workers = 0
+        self._idle = 0
+
+    def submit(self, fn, *args, host=None):
+        job = _Job(Future(), host, fn, args)
+
+        with self._condition:
+            self._queue.append(job)
+            if len(self._queue) > self._idle \
+                    and self._workers < self.max_workers:
+                self._workers += 1
+                threading.Thread(target=self._work, daemon=True).start()
+            else:
+                self._condition.notify_all()
+
+        return job.future
+
+    def result(self, future):
+        # A job still waiting for a worker runs on the caller's thread, so
+        # jobs that wait on jobs of their own can't deadlock the pool
+        job = None
+        with self._condition:
+            for i, queued in enumerate(self._queue):
+                if queued.future is future:
+                    job = self._queue.pop(i)
+                    self._running[job.host] = \
+                        self._running.get(job.host, 0) + 1
+                    break
+
+        if job is not None:
+            self._run(job)
+
+        return future.result()
+
+    def _next_job(self):
+        # Work for a host that is at its limit stays queued instead of
+        # taking a worker that other hosts could use
+        for i, job in enumerate(self._queue):
+            if job.host is None \
+                    or self._running.get(job.host, 0) < self.max_per_host:
+                del self._queue[i]
+                self._running[job.host] = self._running.get(job.host, 0) + 1
+                return job
+
+        return None
+
+    def _work(self):
+        while True:
+            with self._condition:
+                job = self._next_job()
+                while job is None:
+                    self._idle += 1
+                    self._condition.wait()
+                    self._idle -= 1
+                    job = self._next_job()
+
+            self._run(job)
+
+    def _run(self, job):
+        try:
+            if job.future.set_running_or_notify_cancel():
+                try:
+                    result = job.fn(*job.args)
+                except BaseException as e:
+                    job.future.set_exception(e)
+                else:
+                    job.future.set_result(result)
+        finally:
+            with self._condition:
+                self._running[job.host] -= 1
+                self._condition.notify_all()
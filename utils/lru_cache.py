@@ -0,0 +1,47 @@
+from collections import OrderedDict
+
+
+class LRUCache:
+    def __init__(self, max_cost):
+        self.max_cost = max_cost
+
+        self._entries = OrderedDict()
+        self._cost = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, key):
+        return key in self._entries
+
+    @property
+    def cost(self):
+        return self._cost
+
+    def get(self, key, default=None):
+        entry = self._entries.get(key, None)
+        if entry is None:
+            return default
+
+        self._entries.move_to_end(key)
+        return entry[0]
+
+    def put(self, key, value, cost=1):
+        self.remove(key)
+        if cost > self.max_cost:
+            return
+
+        self._entries[key] = (value, cost)
+        self._cost += cost
+        while self._cost > self.max_cost:
+            _, (_, evicted_cost) = self._entries.popitem(last=False)
+            self._cost -= evicted_cost
+
+    def remove(self, key):
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._cost -= entry[1]
+
+    def clear(self):
+        self._entries.clear()
+        self._cost = 0
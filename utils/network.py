@@ -1,38 +1,803 @@
+import io
+import base64
 import ssl
-import urllib
-import shutil
 import json
 import os
+import hashlib
+import time
+import socket
+import threading
+import concurrent.futures
+import http.client
+import urllib.request
+from urllib.error import URLError, HTTPError
+from urllib.parse import urlsplit, urljoin, unquote
+from .http_cache import HTTPCache
+from .cancellation import CancelledError, check
+from .io_executor import IOExecutor
+
+
+DEFAULT_TIMEOUT = 5
+MAX_CONNECTIONS_PER_HOST = 4
+MAX_REDIRECTS = 5
+REDIRECT_STATUSES = (301, 302, 303, 307, 308)
+CHUNK_SIZE = 64 * 1024
+MAX_RETRIES = 3
+RETRY_BACKOFF = 0.5
+RETRYABLE_ERRORS = (socket.timeout, ConnectionError, URLError,
+                    http.client.HTTPException)
+DEFAULT_SEGMENTS = 4
+SEGMENT_THRESHOLD = 64 * 1024 * 1024
+MAX_IO_THREADS = 16
+WAIT_INTERVAL = 0.1
+USER_AGENT = 'qgis-stac-browser'
+MULTIHASH_ALGORITHMS = {
+    0x11: 'sha1',
+    0x12: 'sha256',
+    0x13: 'sha512',
+    0xd5: 'md5',
+}
+
+_ssl_context = None
+_ssl_context_lock = threading.Lock()
+
+_session = None
+_session_lock = threading.Lock()
+
+_seek_lock = threading.Lock()
+
+_executor = None
+_executor_lock = threading.Lock()
 
 
 def ssl_context():
-    if os.environ.get('STAC_DEBUG', False):
-        return ssl._create_unverified_context()
-    return ssl.SSLContext()
-
-
-def request(url, data=None):
-    r = urllib.request.Request(url)
-    if data is not None:
-        body_bytes = json.dumps(data).encode('utf-8')
-        r.add_header('Content-Type', 'application/json; charset=utf-8')
-        r.add_header('Content-Length', len(body_bytes))
-        r = urllib.request.urlopen(
-            r,
-            body_bytes,
-            context=ssl_context(),
-            timeout=5
-        )
-    else:
-        r = urllib.request.urlopen(r, context=ssl_context(), timeout=5)
-
-    return json.loads(r.read())
-
-
-def download(url, path):
-    with urllib.request.urlopen(
-            url,
-            context=ssl_context(),
-            timeout=5) as response, \
-            open(path, 'wb') as f:
-        shutil.copyfileobj(response, f)
+    global _ssl_context
+    with _ssl_context_lock:
+        if _ssl_context is None:
+            if os.environ.get('STAC_DEBUG', False):
+                _ssl_context = ssl._create_unverified_context()
+            else:
+                _ssl_context = ssl.SSLContext()
+        return _ssl_context
+
+
+def proxy_for(url):
+    parts = urlsplit(url)
+    proxy = urllib.request.getproxies().get(parts.scheme, None)
+    if proxy is None or urllib.request.proxy_bypass(parts.hostname or ''):
+        return None
+
+    if '://' not in proxy:
+        proxy = f'http://{proxy}'
+    return urlsplit(proxy)
+
+
+def proxy_headers(proxy):
+    if proxy is None or proxy.username is None:
+        return {}
+
+    credentials = f'{unquote(proxy.username)}:{unquote(proxy.password or "")}'
+    token = base64.b64encode(credentials.encode('utf-8')).decode('ascii')
+    return {'Proxy-Authorization': f'Basic {token}'}
+
+
+class ChecksumError(URLError):
+    pass
+
+
+class RangeNotHonouredError(URLError):
+    pass
+
+
+def read_varint(data, offset):
+    value = 0
+    shift = 0
+    while True:
+        byte = data[offset]
+        offset += 1
+        value |= (byte & 0x7f) << shift
+        if not byte & 0x80:
+            return (value, offset)
+        shift += 7
+
+
+def verify_checksum(path, checksum):
+    try:
+        data = bytes.fromhex(checksum)
+        code, offset = read_varint(data, 0)
+        length, offset = read_varint(data, offset)
+    except (ValueError, IndexError):
+        return True
+
+    algorithm = MULTIHASH_ALGORITHMS.get(code, None)
+    if algorithm is None:
+        # Unknown hash functions can't be checked; trust the size instead
+        return True
+
+    digest = hashlib.new(algorithm)
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(CHUNK_SIZE), b''):
+            digest.update(chunk)
+
+    return digest.digest() == data[offset:offset + length]
+
+
+def parse_content_range(value):
+    # bytes <start>-<end>/<total or *>
+    unit, _, spec = value.partition(' ')
+    byte_range, _, total = spec.partition('/')
+    start = int(byte_range.partition('-')[0])
+    total = None if total in ['', '*'] else int(total)
+    return (start, total)
+
+
+def write_at(fd, data, offset):
+    data = memoryview(data)
+    if hasattr(os, 'pwrite'):
+        while data:
+            written = os.pwrite(fd, data, offset)
+            data = data[written:]
+            offset += written
+        return
+
+    # No positional writes (Windows); serialize seek + write on the shared fd
+    with _seek_lock:
+        os.lseek(fd, offset, os.SEEK_SET)
+        while data:
+            written = os.write(fd, data)
+            data = data[written:]
+
+
+def part_meta_path(part_path):
+    return f'{part_path}.json'
+
+
+def read_part_meta(part_path):
+    try:
+        with open(part_meta_path(part_path), 'r') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def write_part_meta(part_path, meta):
+    meta_path = part_meta_path(part_path)
+    temp_path = f'{meta_path}.tmp'
+    with open(temp_path, 'w') as f:
+        json.dump(meta, f)
+    os.replace(temp_path, meta_path)
+
+
+def remove_part_meta(part_path):
+    try:
+        os.remove(part_meta_path(part_path))
+    except FileNotFoundError:
+        pass
+
+
+def remove_part(part_path):
+    for path in [part_path, part_meta_path(part_path)]:
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+
+def abort_connection(connection):
+    # Shutting the socket down unblocks a read in progress on another thread
+    sock = connection.sock
+    if sock is None:
+        return
+
+    try:
+        sock.shutdown(socket.SHUT_RDWR)
+    except OSError:
+        pass
+
+
+class ConnectionPool:
+    def __init__(self, scheme, host, port, proxy=None,
+                 max_connections=MAX_CONNECTIONS_PER_HOST,
+                 timeout=DEFAULT_TIMEOUT):
+        self.scheme = scheme
+        self.host = host
+        self.port = port
+        self.proxy = proxy
+        self.timeout = timeout
+
+        self._idle = []
+        self._lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(max_connections)
+
+    def new_connection(self):
+        host, port = self.host, self.port
+        if self.proxy is not None:
+            host, port = self.proxy.hostname, self.proxy.port
+
+        if self.scheme == 'https':
+            connection = http.client.HTTPSConnection(
+                host,
+                port,
+                timeout=self.timeout,
+                context=ssl_context()
+            )
+            if self.proxy is not None:
+                connection.set_tunnel(self.host, self.port,
+                                      headers=proxy_headers(self.proxy))
+        else:
+            connection = http.client.HTTPConnection(
+                host,
+                port,
+                timeout=self.timeout
+            )
+
+        return connection
+
+    def acquire(self, fresh=False, token=None):
+        while not self._slots.acquire(timeout=WAIT_INTERVAL):
+            check(token)
+        if not fresh:
+            with self._lock:
+                if self._idle:
+                    return (self._idle.pop(), True)
+
+        return (self.new_connection(), False)
+
+    def release(self, connection, reusable=True):
+        if reusable:
+            with self._lock:
+                self._idle.append(connection)
+        else:
+            connection.close()
+        self._slots.release()
+
+    def close(self):
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for connection in idle:
+            connection.close()
+
+
+class Response:
+    def __init__(self, url, pool, connection, response, token=None):
+        self.url = url
+        self._pool = pool
+        self._connection = connection
+        self._response = response
+        self._released = False
+        self._aborted = False
+
+        self._token = token
+        self._token_handle = None
+        if token is not None:
+            self._token_handle = token.register(self.abort)
+
+    @property
+    def status(self):
+        return self._response.status
+
+    @property
+    def reason(self):
+        return self._response.reason
+
+    @property
+    def headers(self):
+        return self._response.headers
+
+    def read(self, amt=None):
+        return self._response.read(amt)
+
+    def readinto(self, b):
+        return self._response.readinto(b)
+
+    def abort(self):
+        self._aborted = True
+        abort_connection(self._connection)
+
+    def close(self):
+        if self._released:
+            return
+        self._released = True
+
+        if self._token is not None:
+            self._token.unregister(self._token_handle)
+
+        complete = self._response.isclosed() and not self._aborted
+        reusable = complete and not self._response.will_close
+        self._response.close()
+        self._pool.release(self._connection, reusable=reusable)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+
+class Session:
+    def __init__(self, timeout=DEFAULT_TIMEOUT,
+                 max_connections_per_host=MAX_CONNECTIONS_PER_HOST,
+                 cache=None):
+        self.timeout = timeout
+        self.max_connections_per_host = max_connections_per_host
+        self.cache = cache
+
+        self._pools = {}
+        self._lock = threading.Lock()
+
+    def pool(self, url):
+        parts = urlsplit(url)
+        proxy = proxy_for(url)
+        port = parts.port
+        if port is None:
+            port = 443 if parts.scheme == 'https' else 80
+
+        key = (parts.scheme, parts.hostname, port, proxy)
+        with self._lock:
+            pool = self._pools.get(key, None)
+            if pool is None:
+                pool = ConnectionPool(
+                    parts.scheme,
+                    parts.hostname,
+                    port,
+                    proxy=proxy,
+                    max_connections=self.max_connections_per_host,
+                    timeout=self.timeout
+                )
+                self._pools[key] = pool
+
+        return pool
+
+    def open(self, url, data=None, headers={}, method=None, token=None):
+        check(token)
+        if urlsplit(url).scheme not in ['http', 'https']:
+            return urllib.request.urlopen(url, data, timeout=self.timeout)
+
+        if method is None:
+            method = 'GET' if data is None else 'POST'
+
+        for _ in range(MAX_REDIRECTS + 1):
+            response = self._send(url, method, data, headers, token=token)
+
+            location = response.headers.get('Location', None)
+            if response.status not in REDIRECT_STATUSES or location is None:
+                break
+
+            response.read()
+            response.close()
+
+            url = urljoin(url, location)
+            if response.status == 303 or (response.status in [301, 302]
+                                          and method == 'POST'):
+                method = 'GET'
+                data = None
+        else:
+            raise URLError(f'Too many redirects for {url}')
+
+        if response.status >= 400:
+            body = response.read()
+            response.close()
+            raise HTTPError(url, response.status, response.reason,
+                            response.headers, io.BytesIO(body))
+
+        return response
+
+    def request(self, url, data=None, token=None):
+        headers = {'Accept': 'application/json'}
+        body_bytes = None
+        if data is not None:
+            body_bytes = json.dumps(data).encode('utf-8')
+            headers['Content-Type'] = 'application/json; charset=utf-8'
+
+        if body_bytes is None and self.cache is not None \
+                and urlsplit(url).scheme in ['http', 'https']:
+            return json.loads(self._cached_get(url, headers, token=token))
+
+        with self.open(url, data=body_bytes, headers=headers,
+                       token=token) as response:
+            body = response.read()
+        check(token)
+        return json.loads(body)
+
+    def download(self, url, path, on_progress=None, checksum=None,
+                 size=None, segments=1, segment_threshold=SEGMENT_THRESHOLD,
+                 probe=None, token=None):
+        part_path = f'{path}.part'
+        # Segments beyond the pool size would only queue for a connection
+        segments = min(segments, self.max_connections_per_host)
+        segmented = segments > 1 \
+            and urlsplit(url).scheme in ['http', 'https'] \
+            and (size is None or size >= segment_threshold)
+
+        ranges = None
+        if segmented:
+            # One probe serves every attempt; a caller may already have one
+            if probe is None:
+                try:
+                    probe = self.probe(url, token=token)
+                except RETRYABLE_ERRORS:
+                    check(token)
+            if probe is not None and probe['ranges'] \
+                    and probe['length'] is not None \
+                    and probe['length'] >= segment_threshold:
+                ranges = probe
+
+        try:
+            self._download_with_retries(url, part_path, on_progress, token,
+                                        ranges, segments)
+        except CancelledError:
+            remove_part(part_path)
+            raise
+
+        if checksum is not None and not verify_checksum(part_path, checksum):
+            remove_part(part_path)
+            raise ChecksumError(f'Checksum mismatch for {url}')
+
+        os.replace(part_path, path)
+        remove_part_meta(part_path)
+
+    def _download_with_retries(self, url, part_path, on_progress, token,
+                               ranges, segments):
+        attempts = 0
+        while True:
+            try:
+                if ranges is not None:
+                    self._download_segments(url, part_path, ranges, segments,
+                                            on_progress, token)
+                else:
+                    self._download_part(url, part_path, on_progress, token)
+                return
+            except HTTPError:
+                raise
+            except RangeNotHonouredError:
+                # The probe is stale, so fall back to a single stream
+                check(token)
+                attempts += 1
+                if attempts > MAX_RETRIES:
+                    raise
+                ranges = None
+            except RETRYABLE_ERRORS:
+                # A cancelled transfer also surfaces as a socket error
+                check(token)
+                # Timeouts and dropped connections resume from the .part file
+                attempts += 1
+                if attempts > MAX_RETRIES:
+                    raise
+                self._backoff(attempts, token)
+            except OSError:
+                # Local failures such as a full disk won't clear on retry
+                check(token)
+                raise
+
+    def _backoff(self, attempts, token):
+        delay = RETRY_BACKOFF * 2 ** (attempts - 1)
+        if token is None:
+            time.sleep(delay)
+        else:
+            token.wait(delay)
+        check(token)
+
+    def head(self, url, token=None):
+        try:
+            with self.open(url, method='HEAD', token=token) as response:
+                response.read()
+                return (response.url, response.headers)
+        except HTTPError:
+            # Some object stores only sign GET requests
+            return None
+
+    def probe(self, url, token=None):
+        head = self.head(url, token=token)
+        if head is None:
+            return None
+        final_url, headers = head
+
+        length = headers.get('Content-Length', None)
+        return {
+            'url': final_url,
+            'length': None if length is None else int(length),
+            'ranges': headers.get('Accept-Ranges', 'none').lower() == 'bytes',
+            'etag': headers.get('ETag', None),
+            'last_modified': headers.get('Last-Modified', None),
+        }
+
+    def _download_segments(self, url, part_path, ranges, count, on_progress,
+                           token):
+        length = ranges['length']
+        validator = ranges['etag'] or ranges['last_modified']
+
+        meta = read_part_meta(part_path)
+        resumable = meta is not None and validator is not None \
+            and os.path.exists(part_path) \
+            and meta.get('segments', None) is not None \
+            and all(meta.get(k, None) == ranges[k]
+                    for k in ['length', 'etag', 'last_modified']) \
+            and meta.get('url', None) == url
+
+        if resumable:
+            segments = meta['segments']
+        else:
+            # [start, end, position] per segment, end exclusive
+            step = -(-length // count)
+            segments = [
+                [start, min(start + step, length), start]
+                for start in range(0, length, step)
+            ]
+            with open(part_path, 'wb') as f:
+                f.truncate(length)
+
+        meta = {
+            'url': url,
+            'etag': ranges['etag'],
+            'last_modified': ranges['last_modified'],
+            'length': length,
+            'segments': segments,
+        }
+        write_part_meta(part_path, meta)
+
+        lock = threading.Lock()
+        received = [sum(s[2] - s[0] for s in segments)]
+
+        def progress(amount):
+            with lock:
+                received[0] += amount
+                value = received[0]
+            if on_progress is not None:
+                on_progress(value, length)
+
+        progress(0)
+
+        pending = [s for s in segments if s[2] < s[1]]
+        fd = os.open(part_path, os.O_RDWR | getattr(os, 'O_BINARY', 0))
+        try:
+            futures = [
+                executor().submit(self._download_segment, ranges['url'],
+                                  fd, segment, validator, progress, token,
+                                  host=host_key(ranges['url']))
+                for segment in pending
+            ]
+            errors = [
+                f.exception() for f in
+                concurrent.futures.as_completed(futures)
+                if f.exception() is not None
+            ]
+        finally:
+            os.close(fd)
+            write_part_meta(part_path, meta)
+
+        check(token)
+        if errors:
+            raise errors[0]
+
+        if os.path.getsize(part_path) != length \
+                or any(s[2] != s[1] for s in segments):
+            remove_part(part_path)
+            raise URLError(f'Incomplete download of {url}')
+
+    def _download_segment(self, url, fd, segment, validator, progress,
+                          token):
+        start, end, position = segment
+        headers = {'Range': f'bytes={position}-{end - 1}'}
+        if validator is not None:
+            headers['If-Range'] = validator
+
+        with self.open(url, headers=headers, token=token) as response:
+            content_range = response.headers.get('Content-Range', None)
+            if response.status != 206 or content_range is None \
+                    or parse_content_range(content_range)[0] != position:
+                # The file changed remotely; the next attempt starts over
+                raise RangeNotHonouredError(
+                    f'Range request for {url} was not honoured'
+                )
+
+            while position < end:
+                chunk = response.read(min(CHUNK_SIZE, end - position))
+                check(token)
+                if not chunk:
+                    break
+                write_at(fd, chunk, position)
+                position += len(chunk)
+                segment[2] = position
+                progress(len(chunk))
+
+        if position < end:
+            raise URLError(f'Incomplete segment of {url}')
+
+    def _download_part(self, url, part_path, on_progress, token):
+        meta = read_part_meta(part_path)
+        offset = 0
+        headers = {}
+        if meta is not None and meta.get('url', None) == url \
+                and meta.get('segments', None) is None \
+                and os.path.exists(part_path):
+            offset = os.path.getsize(part_path)
+            validator = meta.get('etag', None) \
+                or meta.get('last_modified', None)
+            if offset > 0 and validator is not None:
+                headers['Range'] = f'bytes={offset}-'
+                headers['If-Range'] = validator
+            else:
+                offset = 0
+
+        try:
+            response = self.open(url, headers=headers, token=token)
+        except HTTPError as e:
+            if e.code != 416 or offset == 0:
+                raise
+            if meta.get('length', None) == offset:
+                # Everything was received before the connection dropped
+                return
+            remove_part(part_path)
+            return self._download_part(url, part_path, on_progress, token)
+
+        with response:
+            status = getattr(response, 'status', None)
+            content_range = response.headers.get('Content-Range', None)
+            if status == 206 and content_range is not None:
+                start, total = parse_content_range(content_range)
+                if start != offset:
+                    response.close()
+                    remove_part(part_path)
+                    return self._download_part(url, part_path, on_progress,
+                                               token)
+                mode = 'ab'
+            else:
+                # The server ignored the range or the file changed remotely
+                offset = 0
+                total = response.headers.get('Content-Length', None)
+                if total is not None:
+                    total = int(total)
+                mode = 'wb'
+
+            write_part_meta(part_path, {
+                'url': url,
+                'etag': response.headers.get('ETag', None),
+                'last_modified': response.headers.get('Last-Modified', None),
+                'length': total,
+            })
+
+            received = offset
+            with open(part_path, mode) as f:
+                if on_progress is not None:
+                    on_progress(received, total)
+                while True:
+                    chunk = response.read(CHUNK_SIZE)
+                    check(token)
+                    if not chunk:
+                        break
+                    f.write(chunk)
+                    received += len(chunk)
+                    if on_progress is not None:
+                        on_progress(received, total)
+
+        if total is not None and received < total:
+            raise URLError(f'Incomplete download of {url}')
+
+    def close(self):
+        with self._lock:
+            pools, self._pools = self._pools, {}
+        for pool in pools.values():
+            pool.close()
+
+    def _cached_get(self, url, headers, token=None):
+        meta = self.cache.lookup(url)
+        conditional_headers = dict(headers)
+        conditional_headers.update(self.cache.validators(meta))
+
+        with self.open(url, headers=conditional_headers,
+                       token=token) as response:
+            body = response.read()
+            status = response.status
+            response_headers = response.headers
+
+        if status == 304:
+            cached = None
+            if meta is not None:
+                cached = self.cache.read(url)
+            if cached is not None:
+                return cached
+
+            # The cached body went away after revalidation; refetch it
+            with self.open(url, headers=headers, token=token) as response:
+                body = response.read()
+                response_headers = response.headers
+
+        check(token)
+        self.cache.store(url, response_headers, body)
+        return body
+
+    def _send(self, url, method, data, headers, token=None):
+        parts = urlsplit(url)
+        pool = self.pool(url)
+
+        target = parts.path or '/'
+        if parts.query:
+            target = f'{target}?{parts.query}'
+        if pool.proxy is not None and parts.scheme == 'http':
+            target = url
+
+        request_headers = {
+            'User-Agent': USER_AGENT,
+            'Accept-Encoding': 'identity',
+        }
+        if pool.proxy is not None and parts.scheme == 'http':
+            request_headers.update(proxy_headers(pool.proxy))
+        request_headers.update(headers)
+
+        fresh = False
+        while True:
+            check(token)
+            connection, reused = pool.acquire(fresh=fresh, token=token)
+            handle = None
+            if token is not None:
+                handle = token.register(
+                    lambda connection=connection: abort_connection(connection)
+                )
+
+            try:
+                connection.request(method, target, body=data,
+                                   headers=request_headers)
+                response = connection.getresponse()
+            except socket.timeout:
+                pool.release(connection, reusable=False)
+                check(token)
+                raise
+            except (http.client.HTTPException, OSError) as e:
+                pool.release(connection, reusable=False)
+                check(token)
+                if reused:
+                    # The server dropped an idle keep-alive connection
+                    fresh = True
+                    continue
+                raise URLError(e)
+            finally:
+                if token is not None:
+                    token.unregister(handle)
+
+            return Response(url, pool, connection, response, token=token)
+
+
+def session():
+    global _session
+    with _session_lock:
+        if _session is None:
+            _session = Session(cache=HTTPCache())
+        return _session
+
+
+def host_key(url):
+    return urlsplit(url).netloc
+
+
+def executor():
+    # Shared by every request fan-out so the number of open transfers stays
+    # bounded however many searches and downloads run at once. Work is
+    # queued per host, so a busy host can't hold every worker.
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = IOExecutor(max_workers=MAX_IO_THREADS,
+                                   max_per_host=MAX_CONNECTIONS_PER_HOST)
+        return _executor
+
+
+def request(url, data=None, token=None):
+    return session().request(url, data=data, token=token)
+
+
+def head(url, token=None):
+    return session().head(url, token=token)
+
+
+def probe(url, token=None):
+    return session().probe(url, token=token)
+
+
+def download(url, path, on_progress=None, checksum=None, size=None,
+             segments=1, segment_threshold=SEGMENT_THRESHOLD, probe=None,
+             token=None):
+    return session().download(url, path, on_progress=on_progress,
+                              checksum=checksum, size=size,
+                              segments=segments,
+                              segment_threshold=segment_threshold,
+                              probe=probe, token=token)
@@ -0,0 +1,149 @@
+import os
+import time
+import gzip
+import json
+import hashlib
+import tempfile
+import threading
+from .lru_cache import LRUCache
+
+
+DEFAULT_TTL = 10 * 60
+MEMORY_ENTRIES = 16
+
+_shared = None
+_shared_lock = threading.Lock()
+
+
+def default_directory():
+    return os.path.join(
+        tempfile.gettempdir(),
+        'qgis-stac-browser',
+        'search-cache'
+    )
+
+
+def shared():
+    global _shared
+    with _shared_lock:
+        if _shared is None:
+            _shared = SearchCache()
+        return _shared
+
+
+class SearchCache:
+    def __init__(self, directory=None, memory_entries=MEMORY_ENTRIES):
+        if directory is None:
+            directory = default_directory()
+
+        self.directory = directory
+
+        self._memory = LRUCache(memory_entries)
+        self._lock = threading.Lock()
+
+    @property
+    def memory_entries(self):
+        return self._memory.max_cost
+
+    @memory_entries.setter
+    def memory_entries(self, value):
+        self._memory.max_cost = value
+
+    def key(self, api, collections=[], bbox=[], start_time=None,
+            end_time=None, limit=50, page_limit=10, item_limit=None,
+            drop_keys=()):
+        body = api.search_body(collections, bbox, start_time, end_time,
+                               limit)
+        query = {
+            'href': api.href.rstrip('/'),
+            'collections': sorted(body['collections']),
+            'bbox': [round(float(v), 6) for v in body['bbox']],
+            'time': body['time'],
+            'limit': limit,
+            'page_limit': page_limit,
+            'item_limit': item_limit,
+            # Cached features are stored already compacted
+            'drop_keys': sorted(drop_keys),
+        }
+
+        return hashlib.sha256(
+            json.dumps(query, sort_keys=True).encode('utf-8')
+        ).hexdigest()
+
+    def path(self, key):
+        return os.path.join(self.directory, f'{key}.json.gz')
+
+    def get(self, key, ttl=DEFAULT_TTL):
+        if ttl is None or ttl <= 0:
+            return None
+
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key, None)
+            if entry is not None:
+                created, features = entry
+                if now - created < ttl:
+                    return features
+                self._memory.remove(key)
+
+        try:
+            with gzip.open(self.path(key), 'rt', encoding='utf-8') as f:
+                entry = json.load(f)
+        except (OSError, ValueError, EOFError):
+            return None
+
+        created = entry.get('created', 0)
+        if now - created >= ttl:
+            self._remove(self.path(key))
+            return None
+
+        features = entry.get('features', [])
+        self._remember(key, created, features)
+        return features
+
+    def put(self, key, features, ttl=DEFAULT_TTL):
+        created = time.time()
+        self._remember(key, created, features)
+
+        if not os.path.exists(self.directory):
+            os.makedirs(self.directory, exist_ok=True)
+        self.prune(ttl)
+
+        path = self.path(key)
+        temp_path = f'{path}.{threading.get_ident()}.tmp'
+        try:
+            with gzip.open(temp_path, 'wt', encoding='utf-8') as f:
+                json.dump({'created': created, 'features': features}, f)
+            os.replace(temp_path, path)
+        except OSError:
+            self._remove(temp_path)
+
+    def prune(self, ttl=DEFAULT_TTL):
+        expired = time.time() - ttl
+        for filename in os.listdir(self.directory):
+            path = os.path.join(self.directory, filename)
+            try:
+                if os.path.getmtime(path) < expired:
+                    os.remove(path)
+            except OSError:
+                continue
+
+    def clear(self):
+        with self._lock:
+            self._memory.clear()
+
+        if not os.path.exists(self.directory):
+            return
+
+        for filename in os.listdir(self.directory):
+            self._remove(os.path.join(self.directory, filename))
+
+    def _remember(self, key, created, features):
+        with self._lock:
+            self._memory.put(key, (created, features))
+
+    def _remove(self, path):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
@@ -0,0 +1,90 @@
+import os
+import tempfile
+import threading
+
+from . import network
+from .cancellation import check
+from .disk_lru import DiskLRU
+
+
+DEFAULT_MAX_SIZE = 256 * 1024 * 1024
+WAIT_INTERVAL = 0.1
+
+_shared = None
+_shared_lock = threading.Lock()
+
+
+def default_directory():
+    return os.path.join(
+        tempfile.gettempdir(),
+        'qgis-stac-browser',
+        'thumbnails'
+    )
+
+
+def shared():
+    global _shared
+    with _shared_lock:
+        if _shared is None:
+            _shared = ThumbnailCache()
+        return _shared
+
+
+class ThumbnailCache(DiskLRU):
+    def __init__(self, directory=None, max_size=DEFAULT_MAX_SIZE):
+        if directory is None:
+            directory = default_directory()
+
+        super(ThumbnailCache, self).__init__(directory, max_size)
+
+        self._in_flight = {}
+
+    def path(self, key):
+        return os.path.join(self.directory, key)
+
+    def contains(self, key):
+        try:
+            os.utime(self.path(key))
+        except OSError:
+            return False
+
+        return True
+
+    def fetch(self, url, key, token=None):
+        # One download per key; the preview and the prefetcher would
+        # otherwise write the same .part file at once
+        while True:
+            with self._lock:
+                done = self._in_flight.get(key, None)
+                if done is None:
+                    done = self._in_flight[key] = threading.Event()
+                    break
+
+            while not done.wait(WAIT_INTERVAL):
+                check(token)
+            if self.contains(key):
+                return self.path(key)
+            # The other fetch failed or was cancelled, so try again
+
+        try:
+            return self._fetch(url, key, token)
+        finally:
+            with self._lock:
+                del self._in_flight[key]
+            done.set()
+
+    def _fetch(self, url, key, token):
+        os.makedirs(self.directory, exist_ok=True)
+
+        path = self.path(key)
+        try:
+            previous_size = os.path.getsize(path)
+        except OSError:
+            previous_size = 0
+
+        network.download(url, path, token=token)
+
+        with self._lock:
+            self._track(os.path.getsize(path), previous_size)
+
+        return path